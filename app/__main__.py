@@ -1,14 +1,14 @@
 from pathlib import Path
-import sys
 
-from streamlit.web import cli as stcli
+from streamlit.web import bootstrap
 
 
 def main() -> None:
     """Launch Streamlit with app/app.py via `python -m app`."""
     script = Path(__file__).resolve().parent / "app.py"
-    sys.argv = ["streamlit", "run", str(script)]
-    stcli.main()
+    # Equivalent to `streamlit run app/app.py` without re-parsing argv through the Click CLI.
+    bootstrap.load_config_options(flag_options={})
+    bootstrap.run(str(script), False, [], flag_options={})
 
 
 if __name__ == "__main__":
@@ -1,91 +1,181 @@
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
 
 def _cast_numeric(df: pd.DataFrame) -> pd.DataFrame:
-    numeric = df.copy()
-    numeric.loc[:, "score"] = pd.to_numeric(numeric["score"], errors="coerce")
-    if "max_score" in numeric.columns:
-        numeric.loc[:, "max_score"] = pd.to_numeric(numeric["max_score"], errors="coerce")
+    # Shallow copy: only the two coerced columns are replaced, the rest share memory with df.
+    # Rubric scores are small numbers, so float32 keeps full precision at half the bandwidth.
+    numeric = df.copy(deep=False)
+    for column in ("score", "max_score"):
+        if column not in df.columns:
+            continue
+        # Float columns (e.g. from a typed loader) are already NaN-aware, so skip re-parsing them.
+        if not pd.api.types.is_float_dtype(df[column]):
+            numeric[column] = pd.to_numeric(df[column], errors="coerce", downcast="float")
+            continue
+        # A column sliced out of a 2D block can be strided; give the groupby reductions unit stride.
+        values = df[column].to_numpy()
+        if not values.flags["C_CONTIGUOUS"]:
+            numeric[column] = np.ascontiguousarray(values)
     return numeric
 
 
-def rubric_item_stats(df: pd.DataFrame) -> pd.DataFrame:
+# Group keys shared by the tables; prepare() encodes each once so no groupby re-hashes the strings.
+_KEY_COLUMNS = ("rubric_item", "category", "student_id", "student_name", "assignment")
+
+
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast numeric columns and precompute the row flags shared by the analytics tables.
+
+    Adds int8 ``_full`` (score reached max_score) and ``_valid_max`` (max_score present)
+    columns and stores the key columns as categoricals. Prepared frames can be passed to
+    any table function without being recast or re-encoded.
+    """
+
     data = _cast_numeric(df)
-    grouped = data.groupby(["rubric_item", "category"], dropna=False)
-    rows = []
-    for (item, category), subset in grouped:
-        max_score = subset["max_score"].dropna()
-        pct_full = (subset["score"] >= max_score).mean() * 100 if not max_score.empty else float("nan")
-        rows.append(
-            {
-                "rubric_item": item,
-                "category": category if pd.notna(category) else "Uncategorized",
-                "count": len(subset),
-                "avg_score": subset["score"].mean(),
-                "median_score": subset["score"].median(),
-                "std_score": subset["score"].std(ddof=0),
-                "max_score_value": max_score.max() if not max_score.empty else float("nan"),
-                "full_points_pct": pct_full,
-            }
-        )
-    return pd.DataFrame(rows).sort_values(by=["category", "rubric_item"])
+    if "max_score" in data.columns:
+        valid_max = data["max_score"].notna()
+        is_full = (data["score"] >= data["max_score"]) & valid_max
+    else:
+        valid_max = is_full = pd.Series(False, index=data.index)
+    data["_full"] = is_full.astype(np.int8)
+    data["_valid_max"] = valid_max.astype(np.int8)
+    for column in _KEY_COLUMNS:
+        if column in data.columns and not isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = data[column].astype("category")
+    return data
+
+
+def _prepared(df: pd.DataFrame) -> pd.DataFrame:
+    if "_full" in df.columns and "_valid_max" in df.columns:
+        return df
+    return prepare(df)
+
+
+def _percent_of(part: pd.Series, total: pd.Series) -> pd.Series:
+    """Return part / total * 100 in float64, NaN where total is not positive."""
+
+    total = total.astype("float64")
+    return part.astype("float64") / total.where(total > 0) * 100
+
+
+def _key_codes(values: pd.Series) -> pd.Series:
+    """Return integer codes for ``values``; missing values stay missing so nunique skips them."""
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+    else:
+        codes, _ = pd.factorize(values)
+    return pd.Series(codes, index=values.index).where(codes >= 0)
+
+
+def rubric_item_stats(df: pd.DataFrame) -> pd.DataFrame:
+    return _rubric_item_stats(_prepared(df))
+
+
+def _rubric_item_stats(data: pd.DataFrame) -> pd.DataFrame:
+    grouped = data.groupby(["rubric_item", "category"], dropna=False, observed=True, sort=False)
+    result = grouped.agg(
+        count=("score", "size"),
+        avg_score=("score", "mean"),
+        median_score=("score", "median"),
+        max_score_value=("max_score", "max"),
+    )
+    result.insert(3, "std_score", grouped["score"].std(ddof=0))
+
+    flag_sums = grouped[["_full", "_valid_max"]].sum()
+    full_rows, valid_rows = flag_sums["_full"], flag_sums["_valid_max"]
+    result["full_points_pct"] = _percent_of(full_rows, valid_rows)
+    result = result.reset_index()
+    result["rubric_item"] = result["rubric_item"].astype(object)
+    result["category"] = result["category"].astype(object).fillna("Uncategorized")
+    return result.sort_values(by=["category", "rubric_item"])
 
 
 def category_breakdown(df: pd.DataFrame) -> pd.DataFrame:
-    data = _cast_numeric(df)
-    grouped = data.groupby("category", dropna=False)
-    rows = []
-    for category, subset in grouped:
-        total_scored = subset["score"].sum()
-        total_possible = subset["max_score"].sum() if "max_score" in subset else float("nan")
-        pct_of_total = (total_scored / total_possible * 100) if total_possible and total_possible > 0 else float("nan")
-        rows.append(
-            {
-                "category": category if pd.notna(category) else "Uncategorized",
-                "items": subset["rubric_item"].nunique(),
-                "submissions": subset["student_id"].nunique(),
-                "score_sum": total_scored,
-                "max_sum": total_possible,
-                "pct_of_total": pct_of_total,
-            }
-        )
-    return pd.DataFrame(rows).sort_values(by="category")
+    return _category_breakdown(_prepared(df))
+
+
+def _category_breakdown(data: pd.DataFrame) -> pd.DataFrame:
+    aggregations = {
+        "items": ("_item_code", "nunique"),
+        "submissions": ("_student_code", "nunique"),
+        "score_sum": ("score", "sum"),
+    }
+    if "max_score" in data.columns:
+        aggregations["max_sum"] = ("max_score", "sum")
+    # nunique over integer codes avoids hashing the raw strings once per group.
+    coded = data.assign(_item_code=_key_codes(data["rubric_item"]), _student_code=_key_codes(data["student_id"]))
+    grouped = coded.groupby("category", dropna=False, observed=True, sort=False)
+    result = grouped.agg(**aggregations).reset_index()
+    if "max_sum" not in result.columns:
+        result["max_sum"] = np.nan
+    result["pct_of_total"] = _percent_of(result["score_sum"], result["max_sum"])
+    result["category"] = result["category"].astype(object).fillna("Uncategorized")
+    return result.sort_values(by="category")
 
 
 def student_summary(df: pd.DataFrame) -> pd.DataFrame:
-    data = _cast_numeric(df)
-    grouped = data.groupby(["student_id", "student_name", "assignment"], dropna=False)
-    rows = []
-    for (student_id, name, assignment), subset in grouped:
-        total_score = subset["score"].sum()
-        total_max = subset["max_score"].sum() if "max_score" in subset else float("nan")
-        pct = (total_score / total_max * 100) if total_max and total_max > 0 else float("nan")
-        rows.append(
-            {
-                "student_id": student_id,
-                "student_name": name,
-                "assignment": assignment,
-                "score_sum": total_score,
-                "max_sum": total_max,
-                "percent": pct,
-            }
-        )
-    return pd.DataFrame(rows).sort_values(by="percent", ascending=False)
+    return _student_summary(_prepared(df))
+
+
+def _student_summary(data: pd.DataFrame) -> pd.DataFrame:
+    aggregations = {"score_sum": ("score", "sum")}
+    if "max_score" in data.columns:
+        aggregations["max_sum"] = ("max_score", "sum")
+    grouped = data.groupby(["student_id", "student_name", "assignment"], dropna=False, observed=True, sort=False)
+    result = grouped.agg(**aggregations).reset_index()
+    for column in ("student_id", "student_name", "assignment"):
+        result[column] = result[column].astype(object)
+    if "max_sum" not in result.columns:
+        result["max_sum"] = np.nan
+    result["percent"] = _percent_of(result["score_sum"], result["max_sum"])
+    return result.sort_values(by="percent", ascending=False)
 
 
 def score_distribution(df: pd.DataFrame, bins: int = 10) -> pd.DataFrame:
-    data = _cast_numeric(df)
-    if "max_score" in data and data["max_score"].notna().any():
-        ratio = data["score"] / data["max_score"].replace(0, pd.NA)
-        ratio = ratio.dropna().clip(lower=0, upper=1)
-        metric = ratio * 100
+    return _score_distribution(_prepared(df), bins=bins)
+
+
+def _score_distribution(data: pd.DataFrame, bins: int = 10) -> pd.DataFrame:
+    score = data["score"].to_numpy(dtype=np.float64, na_value=np.nan)
+    if data["_valid_max"].any():
+        max_score = data["max_score"].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Zero max_score rows stay NaN and are dropped with the other missing ratios.
+        ratio = np.divide(score, max_score, out=np.full_like(score, np.nan), where=max_score != 0)
+        metric = np.clip(ratio[~np.isnan(ratio)] * 100, 0, 100)
     else:
-        metric = data["score"].dropna()
+        metric = score[~np.isnan(score)]
 
-    if metric.empty:
+    if metric.size == 0:
         return pd.DataFrame(columns=["bin", "count"])
 
-    counts, edges = pd.cut(metric, bins=bins, include_lowest=True, retbins=True, right=False)
-    bucket = counts.value_counts().sort_index()
-    labels = [f"{int(edge_start)}-{int(edge_end)}" for edge_start, edge_end in zip(edges[:-1], edges[1:])]
-    return pd.DataFrame({"bin": labels, "count": bucket.tolist()})
+    # Fixed-width bins over the data range; like pd.cut(right=False) the last bin also holds the max.
+    counts, edges = np.histogram(metric, bins=bins)
+    whole_edges = edges.astype(np.int64).astype(str)
+    labels = np.char.add(np.char.add(whole_edges[:-1], "-"), whole_edges[1:]).astype(object)
+    return pd.DataFrame({"bin": labels, "count": counts})
+
+
+@dataclass(frozen=True)
+class AnalyticsResults:
+    """All analytics tables computed from one prepared frame."""
+
+    rubric_items: pd.DataFrame
+    categories: pd.DataFrame
+    students: pd.DataFrame
+    distribution: pd.DataFrame
+
+
+def compute_all(df: pd.DataFrame, bins: int = 10) -> AnalyticsResults:
+    """Run every analytics table on ``df``, coercing numeric columns only once."""
+
+    data = _prepared(df)
+    return AnalyticsResults(
+        rubric_items=_rubric_item_stats(data),
+        categories=_category_breakdown(data),
+        students=_student_summary(data),
+        distribution=_score_distribution(data, bins=bins),
+    )
@@ -4,19 +4,24 @@ This redesign focuses on a SaaS-style shell, guided ingestion, and drill-down
 exploration while keeping analytics logic in ``src/gradescope_analytics``.
 """
 
+import hashlib
+import math
 import sys
-from collections import defaultdict
+import time
+import uuid
 from io import BytesIO
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 import json
 from datetime import datetime
-from itertools import combinations
 import zipfile
+from scipy.sparse import coo_matrix, csr_matrix, triu
+from scipy.sparse.csgraph import connected_components
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
@@ -31,14 +36,22 @@ from gradescope_analytics.concepts import apply_concept_column, load_concept_map
 from gradescope_analytics.io import normalize_dataframe  # noqa: E402
 from gradescope_analytics.mapping import MappingConfig, needs_mapping, suggest_mapping  # noqa: E402
 from gradescope_analytics.recommendations import compute_recommendations  # noqa: E402
-from gradescope_analytics.security import build_export_path, sanitize_filename  # noqa: E402
+from gradescope_analytics.security import sanitize_filename  # noqa: E402
 from tools.generate_synthetic import generate_synthetic_dataset  # noqa: E402
 
 st.set_page_config(page_title="Gradescope Rubric Analytics", layout="wide", page_icon="📊")
 
 DATA_DIR = ROOT / "data"
 CONCEPT_MAPPING_PATH = DATA_DIR / "concept_mappings.json"
-SAFE_EXPORT_DIR = DATA_DIR / "exports"
+# Normalized bundled datasets (demo/synthetic) persisted as Parquet, so a later session skips CSV
+# parsing and normalization. Uploads are never written here: they hold real student IDs.
+NORMALIZED_CACHE_DIR = DATA_DIR / ".cache"
+# Part of every cache key; bump when normalize_dataframe or _optimize_dtypes changes the frame's format.
+NORMALIZED_CACHE_VERSION = 1
+NORMALIZED_CACHE_MAX_FILES = 8
+NORMALIZED_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+# Rubric items shown per page of the concept editor; large courses have thousands.
+CONCEPT_EDITOR_PAGE_SIZE = 100
 
 
 def _rerun():
@@ -73,23 +86,138 @@ def _save_concept_mapping(mapping: Dict[str, str]):
         st.warning(f"Unable to save concept mappings: {exc}")
 
 
+_STATE_DEFAULTS = {
+    "demo_mode": False,
+    "synthetic_mode": False,
+    "raw_df": None,
+    "normalized_df": None,
+    "mapping_cfg": None,
+    "saved_mapping": None,
+    "validation_results": None,
+    "selected_rubric": None,
+    "source_label": None,
+    "source_key": None,
+    "concept_mapping": None,
+    "anonymize_ids": True,
+    "pdf_requested": False,
+    "packet_requested": False,
+    "normalized_csv_requested": False,
+    "df_version": None,
+    "source_digest": None,
+}
+
+
 def _init_state() -> None:
-    defaults = {
-        "demo_mode": False,
-        "synthetic_mode": False,
-        "raw_df": None,
-        "normalized_df": None,
-        "mapping_cfg": None,
-        "saved_mapping": None,
-        "validation_results": None,
-        "selected_rubric": None,
-        "source_label": None,
-        "concept_mapping": None,
-        "anonymize_ids": True,
-    }
-    for key, val in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = val
+    # After the first run every key exists, so reruns only pay for the membership checks.
+    missing = {key: val for key, val in _STATE_DEFAULTS.items() if key not in st.session_state}
+    if missing:
+        st.session_state.update(missing)
+
+
+# Integers at or beyond 2**63 do not fit int64; PyArrow turns them into float64 (losing digits),
+# while the C parser keeps them exact as uint64 or as text.
+_INT64_LIMIT = float(2**63)
+
+
+def _arrow_matches_c_parser(frame: pd.DataFrame) -> bool:
+    """Whether the PyArrow frame has the columns and dtypes the C parser would produce.
+
+    The C parser renames duplicate headers (``X.1``) and blank ones (``Unnamed: N``, e.g. from a
+    trailing comma) where PyArrow keeps them, parses ISO dates/timestamps as text, and keeps
+    out-of-range integer IDs exact; any of these means the file is re-read with the C parser.
+    """
+    if frame.columns.has_duplicates or any(not str(column).strip() for column in frame.columns):
+        return False
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return False
+        if pd.api.types.is_float_dtype(values) and (values.abs() >= _INT64_LIMIT).any():
+            return False
+        if values.dtype == object:
+            first = values.first_valid_index()
+            if first is not None and not isinstance(values[first], str):
+                return False
+    return True
+
+
+def _parse_csv(source) -> pd.DataFrame:
+    """Parse with the multithreaded PyArrow reader, falling back to the C parser.
+
+    The fallback covers environments without pyarrow, files pyarrow rejects, and the known cases
+    where the two parsers disagree (see _arrow_matches_c_parser).
+    """
+    try:
+        frame = pd.read_csv(source, engine="pyarrow")
+    except (ImportError, ValueError):
+        frame = None
+    if frame is not None and _arrow_matches_c_parser(frame):
+        # PyArrow leaves missing strings as None where the C parser gives NaN.
+        for column in frame.columns[(frame.dtypes == object).to_numpy()]:
+            if frame[column].hasnans:
+                frame[column] = frame[column].fillna(np.nan)
+        return frame
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return pd.read_csv(source)
+
+
+# st.cache_data is process-wide and shared by every session, so the ingest caches are bounded:
+# a few bundled files, and uploads (raw student data) expire an hour after they were parsed.
+@st.cache_data(show_spinner=False, max_entries=8)
+def _read_csv_path(path: str, mtime: float) -> pd.DataFrame:
+    """Parse a CSV on disk; ``mtime`` is only part of the cache key so edited files are re-read."""
+    return _parse_csv(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=8, ttl=3600)
+def _read_csv_bytes(data: bytes) -> pd.DataFrame:
+    """Parse uploaded CSV contents, cached on the bytes so reruns skip the parser."""
+    return _parse_csv(BytesIO(data))
+
+
+def _read_csv_file(path: Path) -> pd.DataFrame:
+    return _read_csv_path(str(path), path.stat().st_mtime)
+
+
+# Identifier columns repeat a few hundred distinct values across every row, so categoricals let
+# groupby/isin/nunique run on integer codes. Free-text optional columns (topic, section_id, ta_id)
+# and the derived concept stay object: they are blank-filled with "" throughout the analytics.
+_CATEGORICAL_COLUMNS = ("student_id", "exam_id", "question_id", "rubric_item")
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Store identifier columns as categoricals and points_lost as float32 for the analytics views."""
+    data = df.copy(deep=False)
+    for column in _CATEGORICAL_COLUMNS:
+        if column in data.columns and not isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = data[column].astype("category")
+    data["points_lost"] = pd.to_numeric(data["points_lost"], errors="coerce", downcast="float")
+    return data
+
+
+def _points_lost(df: pd.DataFrame) -> pd.Series:
+    """points_lost as numbers; the float32 column from _optimize_dtypes is returned without a parse."""
+    points = df["points_lost"]
+    if pd.api.types.is_numeric_dtype(points):
+        return points
+    return pd.to_numeric(points, errors="coerce")
+
+
+def _category_text(values: pd.Series, missing: str = "nan", strip: bool = False) -> pd.Series:
+    """Plain string labels for ``values``; categoricals are converted once per category, not per row.
+
+    Missing values become ``missing`` (``astype(str)`` spells them "nan").
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        text = values.astype(object).fillna(missing).astype(str)
+        return text.str.strip() if strip else text
+    labels = values.cat.categories.astype(str)
+    if strip:
+        labels = labels.str.strip()
+    # Code -1 (missing) indexes the trailing placeholder.
+    lookup = np.append(labels.to_numpy(dtype=object), missing)
+    return pd.Series(lookup[values.cat.codes.to_numpy()], index=values.index, name=values.name)
 
 
 def _load_source(demo_mode: bool, synthetic_mode: bool, upload) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
@@ -103,15 +231,15 @@ def _load_source(demo_mode: bool, synthetic_mode: bool, upload) -> Tuple[Optiona
                 st.error(f"Synthetic dataset generation failed: {exc}")
                 return None, None
         try:
-            return pd.read_csv(synthetic_path), "Synthetic dataset (synthetic_class.csv)"
+            return _read_csv_file(synthetic_path), "Synthetic dataset (synthetic_class.csv)"
         except Exception as exc:  # pragma: no cover - defensive
             st.error(f"Unable to load synthetic dataset: {exc}")
             return None, None
 
     if demo_mode:
-        return pd.read_csv(DATA_DIR / "sample_truth.csv"), "Demo dataset (sample_truth.csv)"
+        return _read_csv_file(DATA_DIR / "sample_truth.csv"), "Demo dataset (sample_truth.csv)"
     if upload is not None:
-        return pd.read_csv(upload), upload.name
+        return _read_csv_bytes(upload.getvalue()), upload.name
     return None, None
 
 
@@ -121,45 +249,28 @@ def _mapping_wizard(df: pd.DataFrame) -> Optional[MappingConfig]:
     required_cols = list(df.columns)
     optional_cols = [None] + list(df.columns)
 
-    def select_index(key: str, options: List[str]) -> int:
-        candidate = saved.get(key) or suggested.get(key)
-        return options.index(candidate) if candidate in options else 0
+    required_positions = {col: i for i, col in enumerate(required_cols)}
+    optional_positions = {col: i for i, col in enumerate(optional_cols)}
+
+    def default_index(key: str, positions: Dict[Optional[str], int]) -> int:
+        # A saved choice wins when this file still has it (None counts for optional fields);
+        # otherwise fall back to the suggestion, then to the first option.
+        if key in saved and saved[key] in positions:
+            return positions[saved[key]]
+        return positions.get(suggested.get(key), 0)
 
     with st.form("mapping_form"):
         left, right = st.columns(2)
         with left:
-            student_id = st.selectbox("student_id", options=required_cols, index=select_index("student_id", required_cols))
-            exam_id = st.selectbox("exam_id", options=required_cols, index=select_index("exam_id", required_cols))
-            question_id = st.selectbox("question_id", options=required_cols, index=select_index("question_id", required_cols))
+            student_id = st.selectbox("student_id", options=required_cols, index=default_index("student_id", required_positions))
+            exam_id = st.selectbox("exam_id", options=required_cols, index=default_index("exam_id", required_positions))
+            question_id = st.selectbox("question_id", options=required_cols, index=default_index("question_id", required_positions))
         with right:
-            rubric_item = st.selectbox("rubric_item", options=required_cols, index=select_index("rubric_item", required_cols))
-            points_lost = st.selectbox("points_lost", options=required_cols, index=select_index("points_lost", required_cols))
-            topic_index = 0
-            saved_topic = saved.get("topic")
-            suggested_topic = suggested.get("topic")
-            if saved_topic in optional_cols:
-                topic_index = optional_cols.index(saved_topic)
-            elif suggested_topic in optional_cols:
-                topic_index = optional_cols.index(suggested_topic)
-            topic = st.selectbox("topic (optional)", options=optional_cols, index=topic_index)
-
-            section_idx = 0
-            saved_section = saved.get("section_id")
-            suggested_section = suggested.get("section_id")
-            if saved_section in optional_cols:
-                section_idx = optional_cols.index(saved_section)
-            elif suggested_section in optional_cols:
-                section_idx = optional_cols.index(suggested_section)
-            section_id = st.selectbox("section_id (optional)", options=optional_cols, index=section_idx)
-
-            ta_idx = 0
-            saved_ta = saved.get("ta_id")
-            suggested_ta = suggested.get("ta_id")
-            if saved_ta in optional_cols:
-                ta_idx = optional_cols.index(saved_ta)
-            elif suggested_ta in optional_cols:
-                ta_idx = optional_cols.index(suggested_ta)
-            ta_id = st.selectbox("ta_id (optional)", options=optional_cols, index=ta_idx)
+            rubric_item = st.selectbox("rubric_item", options=required_cols, index=default_index("rubric_item", required_positions))
+            points_lost = st.selectbox("points_lost", options=required_cols, index=default_index("points_lost", required_positions))
+            topic = st.selectbox("topic (optional)", options=optional_cols, index=default_index("topic", optional_positions))
+            section_id = st.selectbox("section_id (optional)", options=optional_cols, index=default_index("section_id", optional_positions))
+            ta_id = st.selectbox("ta_id (optional)", options=optional_cols, index=default_index("ta_id", optional_positions))
 
         submitted = st.form_submit_button("Apply mapping")
 
@@ -186,14 +297,116 @@ def _mapping_wizard(df: pd.DataFrame) -> Optional[MappingConfig]:
         return None
 
 
-def _apply_validation(df: pd.DataFrame) -> List[Dict[str, object]]:
-    results = invariants.run_invariants(df)
+@st.cache_data(show_spinner=False, max_entries=8)
+def _scope_invariants(_df: pd.DataFrame, scope_key: Tuple) -> List[Dict[str, object]]:
+    """Invariant results for the scoped frame; ``scope_key`` identifies ``_df`` so it is never hashed."""
+    return invariants.run_invariants(_df)
+
+
+def _apply_validation(df: pd.DataFrame, scope_key: Tuple) -> List[Dict[str, object]]:
+    results = _scope_invariants(df, scope_key)
     st.session_state["validation_results"] = results
     return results
 
 
-def _exam_order(df: pd.DataFrame) -> List[str]:
-    unique = sorted(df["exam_id"].dropna().unique())
+def _source_digest(demo_mode: bool, synthetic_mode: bool) -> Optional[str]:
+    """Fingerprint of a bundled dataset (path, size, mtime) for the on-disk cache.
+
+    Uploads get None: they carry real, non-anonymized student IDs and must not outlive the session.
+    """
+    if synthetic_mode:
+        path = DATA_DIR / "synthetic_class.csv"
+    elif demo_mode:
+        path = DATA_DIR / "sample_truth.csv"
+    else:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return hashlib.sha1(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")).hexdigest()
+
+
+def _normalized_cache_path(source_digest: Optional[str], mapping: Optional[Dict[str, Optional[str]]]) -> Optional[Path]:
+    if not source_digest:
+        return None
+    key = f"v{NORMALIZED_CACHE_VERSION}:{source_digest}:{json.dumps(mapping, sort_keys=True)}"
+    return NORMALIZED_CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.parquet"
+
+
+def _prune_normalized_cache(now: float) -> None:
+    """Drop cache files older than the age limit, then all but the most recently used few."""
+    try:
+        entries = sorted(
+            ((path.stat().st_mtime, path) for path in NORMALIZED_CACHE_DIR.glob("*.parquet")), reverse=True
+        )
+        for rank, (mtime, path) in enumerate(entries):
+            if rank >= NORMALIZED_CACHE_MAX_FILES or now - mtime > NORMALIZED_CACHE_MAX_AGE_SECONDS:
+                path.unlink(missing_ok=True)
+    except OSError:  # pragma: no cover - concurrent cleanup or read-only data dir
+        pass
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _normalize_dataset(
+    _raw_df: pd.DataFrame,
+    dataset_version: Optional[str],
+    mapping: Optional[Dict[str, Optional[str]]],
+    source_digest: Optional[str] = None,
+) -> Tuple[pd.DataFrame, List[Dict[str, object]]]:
+    """Normalize and validate an ingested dataset once per (dataset, mapping).
+
+    ``dataset_version`` identifies ``_raw_df``, so reruns skip hashing the raw frame as well as the
+    normalization and invariant passes. Bundled datasets (``source_digest`` set) are also kept in
+    ``NORMALIZED_CACHE_DIR``: Parquet preserves the categoricals and float32, so later sessions and
+    server restarts reload them instead of normalizing again.
+    """
+    cache_path = _normalized_cache_path(source_digest, mapping)
+    if cache_path is not None and cache_path.exists():
+        try:
+            normalized_df = pd.read_parquet(cache_path)
+            # The file's mtime doubles as its last-use time for _prune_normalized_cache.
+            cache_path.touch()
+            return normalized_df, invariants.run_invariants(normalized_df)
+        except Exception:  # pragma: no cover - unreadable cache file; rebuilt below
+            pass
+
+    mapping_cfg = MappingConfig.from_dict(mapping) if mapping else None
+    normalized_df, _, _ = normalize_dataframe(_raw_df, mapping=mapping_cfg, infer_mapping=mapping_cfg is None)
+    # Categoricals and float32 from here on, so concept mapping and anonymization run on codes and
+    # the conversion happens once per dataset rather than on every rerun.
+    optimized = _optimize_dtypes(normalized_df)
+    results = invariants.run_invariants(normalized_df)
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            optimized.to_parquet(cache_path, index=False, compression="zstd")
+        except Exception:  # pragma: no cover - read-only data dir or no Parquet engine
+            pass
+    # Runs for uploads too, so files from older app versions still age out.
+    _prune_normalized_cache(time.time())
+    return optimized, results
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _sorted_options(_values: pd.Series, values_key: Tuple) -> List[str]:
+    """Sorted distinct values; ``values_key`` identifies ``_values`` so the column itself is never hashed."""
+    if isinstance(_values.dtype, pd.CategoricalDtype):
+        # A scoped frame keeps every category of the full dataset; only the ones still in use are
+        # options. Dropping the rest works on the codes, so no per-row strings are built.
+        distinct = _values.cat.remove_unused_categories().cat.categories
+    else:
+        distinct = pd.Index(_values.dropna().unique())
+    return sorted(distinct.astype(str).str.strip().unique())
+
+
+def _widget_options(df: pd.DataFrame, column: str, *scope) -> List[str]:
+    """Options for a selectbox/multiselect, computed once per ingested dataset and ``scope``."""
+    return _sorted_options(df[column], (st.session_state.get("df_version"), column, *scope))
+
+
+def _exam_order(df: pd.DataFrame, student_scope: str) -> List[str]:
+    unique = _widget_options(df, "exam_id", st.session_state.get("anonymize_ids"), student_scope)
     mode = st.radio("Exam order", options=["Lexicographic", "Manual"], horizontal=True)
     if mode == "Manual":
         ordered = st.multiselect("Select exams in desired order", options=unique, default=unique)
@@ -203,7 +416,7 @@ def _exam_order(df: pd.DataFrame) -> List[str]:
 
 
 def _student_filter_controls(df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
-    students = sorted(df["student_id"].dropna().unique())
+    students = _widget_options(df, "student_id", st.session_state.get("anonymize_ids"))
     scope = st.radio("Student scope", options=["All students", "Single student", "Multi-select"], index=0, horizontal=True)
     selected_ids: List[str] = []
 
@@ -228,99 +441,68 @@ def _maybe_anonymize_students(df: pd.DataFrame, enabled: bool) -> pd.DataFrame:
     if not enabled:
         return df
 
-    data = df.copy()
-    original_ids = data["student_id"].astype(str)
-    ids = sorted(original_ids.unique())
-    mapping = {sid: f"Student {idx + 1:03d}" for idx, sid in enumerate(ids)}
-    data.loc[:, "student_id"] = original_ids.map(mapping)
-
+    # Sorted codes number students in id order; aliases are formatted once per student, not per row.
+    student_ids = df["student_id"]
+    if isinstance(student_ids.dtype, pd.CategoricalDtype) and not student_ids.hasnans:
+        # Rank the categories instead of factorizing every row's id.
+        student_ids = student_ids.cat.remove_unused_categories()
+        labels = student_ids.cat.categories.astype(str)
+        ranks = np.empty(len(labels), dtype=np.int64)
+        ranks[np.argsort(labels.to_numpy(), kind="stable")] = np.arange(len(labels))
+        codes, n_students = ranks[student_ids.cat.codes.to_numpy()], len(labels)
+    else:
+        codes, uniques = pd.factorize(student_ids.astype(str), sort=True)
+        n_students = len(uniques)
+    aliases = [f"Student {idx + 1:03d}" for idx in range(n_students)]
+    anonymized = pd.Categorical.from_codes(codes, categories=aliases)
+
+    # Shallow copy plus column replacement: the untouched columns are shared with df.
+    data = df.copy(deep=False)
+    data["student_id"] = anonymized
     if "student_name" in data.columns:
-        data.loc[:, "student_name"] = original_ids.map(mapping).fillna("")
+        data["student_name"] = anonymized
 
     return data
 
 
 def _concept_stats(df: pd.DataFrame) -> pd.DataFrame:
-    data = df.copy()
-    data.loc[:, "concept"] = data.get("concept", "").fillna("").astype(str).str.strip()
-    data.loc[:, "points_lost"] = pd.to_numeric(data["points_lost"], errors="coerce")
-    scoped = data[data["concept"] != ""]
+    concept = df.get("concept", pd.Series("", index=df.index)).fillna("").astype(str).str.strip()
+    # Only the three columns used below are materialized, not a copy of the whole frame.
+    scoped = pd.DataFrame(
+        {
+            "concept": concept,
+            "student_code": metrics.identifier_codes(df["student_id"]),
+            "points_lost": _points_lost(df),
+        }
+    )[concept != ""]
     if scoped.empty:
         return pd.DataFrame(columns=["concept", "rows", "students_affected", "points_lost_total", "points_lost_mean"])
 
-    grouped = scoped.groupby("concept", dropna=False)
-    rows = []
-    for concept, subset in grouped:
-        rows.append(
-            {
-                "concept": concept,
-                "rows": len(subset),
-                "students_affected": subset["student_id"].nunique(),
-                "points_lost_total": subset["points_lost"].sum(),
-                "points_lost_mean": subset["points_lost"].mean(),
-            }
+    result = (
+        scoped.groupby("concept")
+        .agg(
+            rows=("points_lost", "size"),
+            students_affected=("student_code", "nunique"),
+            points_lost_total=("points_lost", "sum"),
+            points_lost_mean=("points_lost", "mean"),
         )
-
-    result = pd.DataFrame(rows)
+        .reset_index()
+    )
     return result.sort_values(by="points_lost_total", ascending=False)
 
 
-def _concept_persistence(df: pd.DataFrame, exam_order: List[str]) -> pd.DataFrame:
-    if len(exam_order) < 2:
-        return pd.DataFrame(columns=["concept", "cohort_size", "repeated", "persistence_rate"])
-
-    data = df.copy()
-    data.loc[:, "concept"] = data.get("concept", "").fillna("").astype(str).str.strip()
-    data = data[data["concept"] != ""]
-    if data.empty:
-        return pd.DataFrame(columns=["concept", "cohort_size", "repeated", "persistence_rate"])
-
-    exam_rank = {exam: idx for idx, exam in enumerate(exam_order)}
-    order_list = [exam for exam in exam_order if exam in data["exam_id"].unique()]
-    if len(order_list) < 2:
-        return pd.DataFrame(columns=["concept", "cohort_size", "repeated", "persistence_rate"])
-
-    first_exam = order_list[0]
-    rows = []
-    for concept, subset in data.groupby("concept", dropna=False):
-        cohort_students = set(subset.loc[subset["exam_id"] == first_exam, "student_id"].unique())
-        if not cohort_students:
-            continue
-        later_subset = subset[subset["exam_id"].map(lambda x: exam_rank.get(x, -1) > 0)]
-        repeated = set(later_subset["student_id"].unique()) & cohort_students
-        cohort_size = len(cohort_students)
-        rows.append(
-            {
-                "concept": concept,
-                "cohort_size": cohort_size,
-                "repeated": len(repeated),
-                "persistence_rate": len(repeated) / cohort_size if cohort_size else 0.0,
-            }
-        )
-
-    result = pd.DataFrame(rows)
-    if not result.empty:
-        result = result.sort_values(by="persistence_rate", ascending=False)
-    return result
-
-
-def _course_group_stats(df: pd.DataFrame, group_col: str, label: str) -> pd.DataFrame:
-    stats = metrics.group_comparison(df, group_col, missing_label=f"Unassigned {label}")
+def _course_group_stats(stats: pd.DataFrame) -> pd.DataFrame:
     if stats.empty:
         return stats
 
-    stats = stats.copy()
-    stats.loc[:, "avg_points_per_student"] = stats["avg_points_per_student"].round(2)
-    stats.loc[:, "avg_points_per_row"] = stats["avg_points_per_row"].round(2)
-    stats.loc[:, "total_points_lost"] = stats["total_points_lost"].round(2)
-    return stats
+    return stats.round({"avg_points_per_student": 2, "avg_points_per_row": 2, "total_points_lost": 2})
 
 
-def _render_course_structure(df: pd.DataFrame):
+def _render_course_structure(bundle: SimpleNamespace):
     st.subheader("Course structure disparities")
 
-    section_stats = _course_group_stats(df, "section_id", "section")
-    ta_stats = _course_group_stats(df, "ta_id", "TA")
+    section_stats = _course_group_stats(bundle.section_stats)
+    ta_stats = _course_group_stats(bundle.ta_stats)
 
     if section_stats.empty and ta_stats.empty:
         st.info("Include optional section_id or ta_id columns to compare grading patterns across sections and TAs.")
@@ -339,15 +521,14 @@ def _render_course_structure(df: pd.DataFrame):
         st.dataframe(stats, use_container_width=True, height=280)
         _download_df(f"Download {filename}", stats, filename)
 
-        fig = px.bar(
-            stats,
+        fig = _bar_figure(
+            stats[[column_name, "avg_points_per_student"]],
             x=column_name,
             y="avg_points_per_student",
             labels={column_name: label, "avg_points_per_student": "Avg points lost / student"},
             title=f"{label} disparities",
+            hovertemplate="<b>%{x}</b><br>Avg pts/student: %{y}<extra></extra>",
         )
-        fig.update_traces(hovertemplate=f"<b>%{{x}}</b><br>Avg pts/student: %{{y}}<extra></extra>")
-        _style_fig(fig)
         st.plotly_chart(fig, use_container_width=True)
 
     with col_left:
@@ -356,23 +537,30 @@ def _render_course_structure(df: pd.DataFrame):
         _render_group("TA", ta_stats, "ta_id", "ta_comparison.csv")
 
 
-def _render_exports(df: pd.DataFrame, errors: pd.DataFrame, persistence: pd.DataFrame, rec_df: Optional[pd.DataFrame]):
+def _render_exports(df: pd.DataFrame, errors_by_points: pd.DataFrame, persistence: pd.DataFrame, rec_df: Optional[pd.DataFrame]):
+    """Downloads panel; ``errors_by_points`` is the rubric error table already sorted by points lost."""
     st.subheader("Exports")
 
     st.caption("Download key summaries or generate an instructor-ready PDF.")
-    top_errors = errors.sort_values("points_lost_total", ascending=False).head(20) if not errors.empty else pd.DataFrame()
+    top_errors = errors_by_points.head(20) if not errors_by_points.empty else pd.DataFrame()
     _download_df("Download top issues (CSV)", top_errors, "top_issues.csv")
 
-    _download_df("Download persistence (CSV)", persistence, "persistence.csv")
+    _download_df("Download persistence (CSV)", persistence, "persistence.csv", key="dl:exports:persistence.csv")
 
     if rec_df is not None and not rec_df.empty:
-        _download_df("Download recommendations (CSV)", rec_df, "recommendations.csv")
+        _download_df("Download recommendations (CSV)", rec_df, "recommendations.csv", key="dl:exports:recommendations.csv")
+
+    # Building the PDF is slow, so only do it once asked; later reruns reuse the cached report.
+    if st.button("Prepare instructor report (PDF)"):
+        st.session_state["pdf_requested"] = True
+    if not st.session_state.get("pdf_requested"):
+        return
 
     pdf_bytes, pdf_err = _generate_pdf_report(top_errors, persistence, rec_df)
     if pdf_err:
         st.warning(pdf_err)
     elif pdf_bytes:
-        st.download_button("Generate instructor report (PDF)", data=pdf_bytes, file_name="instructor_report.pdf", mime="application/pdf")
+        st.download_button("Download instructor report (PDF)", data=pdf_bytes, file_name="instructor_report.pdf", mime="application/pdf")
 
 
 def _trajectory_stats(df: pd.DataFrame, exam_order: List[str]):
@@ -385,101 +573,114 @@ def _trajectory_stats(df: pd.DataFrame, exam_order: List[str]):
     return pd.DataFrame(), pd.DataFrame()
 
 
-def _misconception_clusters(df: pd.DataFrame, jaccard_threshold: float = 0.2, corr_threshold: float = 0.3, min_support: int = 2):
-    scoped = df.copy()
-    scoped.loc[:, "rubric_item"] = scoped["rubric_item"].fillna("").astype(str).str.strip()
-    scoped.loc[:, "student_id"] = scoped["student_id"].astype(str)
-    scoped = scoped[scoped["rubric_item"] != ""]
+def _misconception_clusters(
+    df: pd.DataFrame, jaccard_threshold: float = 0.2, corr_threshold: float = 0.3, min_support: int = 2, max_pairs: int = 20
+):
+    # Only (item, student) pairs matter, so work on those two columns; repeated rows count once.
+    pairs = pd.DataFrame(
+        {
+            "rubric_item": _category_text(df["rubric_item"], missing="", strip=True),
+            "student_id": _category_text(df["student_id"]),
+        }
+    )
+    pairs = pairs[pairs["rubric_item"] != ""]
 
-    if scoped.empty:
+    if pairs.empty:
         return [], pd.DataFrame()
 
-    incidence: Dict[str, set] = defaultdict(set)
-    for student_id, sub in scoped.groupby("student_id"):
-        for item in sub["rubric_item"].unique():
-            incidence[item].add(student_id)
-
-    items = [item for item, students in incidence.items() if len(students) >= min_support]
-    if len(items) < 2:
+    # Item x student incidence matrix; items are numbered in first-seen order when walking students by id.
+    pairs = pairs.sort_values("student_id", kind="stable").drop_duplicates()
+    item_codes, item_labels = pd.factorize(pairs["rubric_item"])
+    student_codes, student_labels = pd.factorize(pairs["student_id"])
+    support = np.bincount(item_codes, minlength=len(item_labels))
+    keep = np.flatnonzero(support >= min_support)
+    if len(keep) < 2:
         return [], pd.DataFrame()
 
-    edges = []
-    similarities = []
-    for a, b in combinations(items, 2):
-        sa, sb = incidence[a], incidence[b]
-        inter = len(sa & sb)
-        union = len(sa | sb)
-        if union == 0:
-            continue
-        jaccard = inter / union
-        corr = inter / ((len(sa) * len(sb)) ** 0.5) if len(sa) and len(sb) else 0.0
-        if jaccard >= jaccard_threshold or corr >= corr_threshold:
-            edges.append((a, b))
-        similarities.append({"rubric_item_a": a, "rubric_item_b": b, "jaccard": jaccard, "corr": corr, "cooccurrence": inter})
-
-    # Union-find for clustering
-    parent = {item: item for item in items}
-
-    def find(x):
-        while parent[x] != x:
-            parent[x] = parent[parent[x]]
-            x = parent[x]
-        return x
-
-    def union(x, y):
-        rx, ry = find(x), find(y)
-        if rx != ry:
-            parent[ry] = rx
-
-    for a, b in edges:
-        union(a, b)
-
-    clusters: Dict[str, List[str]] = defaultdict(list)
-    for item in items:
-        clusters[find(item)].append(item)
+    # Drop under-supported items before building the matrix rather than slicing it afterwards.
+    item_row = np.full(len(item_labels), -1)
+    item_row[keep] = np.arange(len(keep))
+    pair_rows = item_row[item_codes]
+    kept = pair_rows >= 0
+    incidence = csr_matrix(
+        (np.ones(int(kept.sum()), dtype=np.int64), (pair_rows[kept], student_codes[kept])),
+        shape=(len(keep), len(student_labels)),
+    )
+    items = item_labels.to_numpy()[keep]
+    support = support[keep]
+
+    # One sparse product gives every pairwise co-occurrence count. Only pairs that co-occur are
+    # kept: the rest have zero jaccard and corr, so they never link items or rank among the top pairs.
+    overlap = triu(incidence @ incidence.T, k=1).tocoo()
+    pair_order = np.lexsort((overlap.col, overlap.row))
+    rows, cols, inter = overlap.row[pair_order], overlap.col[pair_order], overlap.data[pair_order]
+    jaccard = inter / (support[rows] + support[cols] - inter)
+    corr = inter / np.sqrt(support[rows] * support[cols])
+    linked = (jaccard >= jaccard_threshold) | (corr >= corr_threshold)
+    top = np.argsort(-jaccard, kind="stable")[:max_pairs]
+    similarities = {
+        "rubric_item_a": items[rows[top]],
+        "rubric_item_b": items[cols[top]],
+        "jaccard": jaccard[top],
+        "corr": corr[top],
+        "cooccurrence": inter[top],
+    }
+    # Clusters are the connected components of the thresholded similarity graph.
+    adjacency = coo_matrix((np.ones(int(linked.sum())), (rows[linked], cols[linked])), shape=(len(items), len(items)))
+    n_clusters, labels = connected_components(adjacency, directed=False)
 
     cluster_list = []
-    for idx, members in enumerate(clusters.values(), start=1):
-        member_sets = [incidence[m] for m in members]
-        support = len(set().union(*member_sets)) if member_sets else 0
+    for idx in range(n_clusters):
+        member_idx = np.flatnonzero(labels == idx)
+        support_students = int(np.count_nonzero(incidence[member_idx].getnnz(axis=0)))
         cluster_list.append(
             {
-                "label": f"Misconception {idx}",
-                "members": sorted(members),
-                "size": len(members),
-                "support_students": support,
+                "label": f"Misconception {idx + 1}",
+                "members": sorted(items[member_idx]),
+                "size": len(member_idx),
+                "support_students": support_students,
             }
         )
 
+    # Already ordered by descending jaccard.
     sim_df = pd.DataFrame(similarities)
-    if not sim_df.empty:
-        sim_df = sim_df.sort_values(by="jaccard", ascending=False)
-
     return cluster_list, sim_df
 
 
 def _concept_mapping_controls(df: pd.DataFrame) -> Dict[str, str]:
     mapping = _load_concept_mapping()
 
-    has_topic_col = "topic" in df.columns
-    topic_values = df["topic"].fillna("").astype(str).str.strip() if has_topic_col else pd.Series([], dtype=str)
-    has_topic_values = has_topic_col and topic_values.str.len().gt(0).any()
+    # The cached distinct topics answer "is any topic filled in" without a string pass per rerun.
+    has_topic_values = "topic" in df.columns and any(_widget_options(df, "topic"))
 
     if has_topic_values:
         st.success("Using provided topic column as concept dimension.")
         return mapping
 
     st.info("No topic column found or it is blank; map rubric items to concepts.")
-    rubric_items = sorted(df["rubric_item"].dropna().astype(str).str.strip().unique())
+    rubric_items = _widget_options(df, "rubric_item")
 
     search = st.text_input("Filter rubric items", value="", placeholder="Search rubric items")
-    filtered_items = [item for item in rubric_items if search.lower() in item.lower()]
+    if search:
+        items = pd.Series(rubric_items, dtype=object)
+        filtered_items = items[items.str.contains(search, case=False, regex=False, na=False)].tolist()
+    else:
+        filtered_items = rubric_items
 
     concept_suggestions = sorted({c for c in mapping.values() if c})
+    # Only the current page is sent to the editor; rendering and diffing every item dominated reruns.
+    page_count = max(1, math.ceil(len(filtered_items) / CONCEPT_EDITOR_PAGE_SIZE))
+    if page_count > 1:
+        page = int(st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1))
+        st.caption(f"Page {page} of {page_count} ({len(filtered_items)} rubric items). Save before changing pages.")
+    else:
+        page = 1
+    start = (page - 1) * CONCEPT_EDITOR_PAGE_SIZE
+    page_items = filtered_items[start : start + CONCEPT_EDITOR_PAGE_SIZE]
     table_data = pd.DataFrame(
         {
-            "rubric_item": filtered_items,
-            "concept": [mapping.get(item, "") for item in filtered_items],
+            "rubric_item": page_items,
+            "concept": [mapping.get(item, "") for item in page_items],
         }
     )
 
@@ -508,38 +709,55 @@ def _concept_mapping_controls(df: pd.DataFrame) -> Dict[str, str]:
     return st.session_state.get("concept_mapping", mapping)
 
 
-def _apply_concepts(df: pd.DataFrame) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, max_entries=8)
+def _concept_frame(_df: pd.DataFrame, dataset_key: Tuple, mapping_items: Tuple) -> Tuple[pd.DataFrame, int, List[str]]:
+    """Concept column, unmapped row count and distinct concepts, once per (dataset, concept mapping).
+
+    ``dataset_key`` (see _dataset_key) identifies ``_df``, so widget-only reruns skip the string pass.
+    """
+    result = apply_concept_column(_df, dict(mapping_items), unmapped_label="Unmapped")
+    concepts = sorted(c for c in pd.unique(result["concept"]) if c)
+    return result, unmapped_count(result, unmapped_label="Unmapped"), concepts
+
+
+def _apply_concepts(df: pd.DataFrame, dataset_key: Tuple) -> Tuple[pd.DataFrame, List[str]]:
     mapping = _concept_mapping_controls(df)
-    result = apply_concept_column(df, mapping, unmapped_label="Unmapped")
+    result, missing, concepts = _concept_frame(df, dataset_key, tuple(sorted(mapping.items())))
 
-    missing = unmapped_count(result, unmapped_label="Unmapped")
     if missing > 0:
         st.warning(
             f"{missing} rows are Unmapped. Recommendations exclude 'Unmapped' by default. Add topics or map rubric items to improve coverage."
         )
     st.caption(f"Concept coverage: {len(result) - missing} rows mapped, {missing} rows Unmapped.")
-    return result
+    return result, concepts
 
 
-def _download_df(label, df, filename, mime="text/csv"):
-    """Download a dataframe with a guaranteed-unique Streamlit widget key."""
-    import uuid
-    import streamlit as st
+@st.cache_data(show_spinner=False, max_entries=32)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a frame for download once per distinct frame instead of on every rerun.
 
-    # Streamlit requires unique widget keys across reruns and codepaths.
-    ctr = st.session_state.get("_dl_counter", 0) + 1
-    st.session_state["_dl_counter"] = ctr
+    Bounded like _bar_figure: the cache is shared by every session, and a page offers a dozen or so
+    download tables per scope.
+    """
+    # Writing into a binary buffer lets pandas encode chunk by chunk, instead of building the whole
+    # CSV as one str and then a second, encoded copy of it.
+    buffer = BytesIO()
+    df.to_csv(buffer, index=False, encoding="utf-8", lineterminator="\n")
+    return buffer.getvalue()
 
-    key = f"dl:{filename}:{ctr}:{uuid.uuid4().hex}"
-    SAFE_EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+def _download_df(label, df, filename, mime="text/csv", key: Optional[str] = None):
+    """Download a dataframe as CSV.
+
+    The widget key defaults to the filename, which is stable across reruns; pass ``key`` when the
+    same file is offered from more than one place on the page.
+    """
+    key = key or f"dl:{filename}"
     safe_name = sanitize_filename(filename)
-    path = build_export_path(SAFE_EXPORT_DIR, safe_name)
-    data = df.to_csv(index=False).encode("utf-8")
-    path.write_bytes(data)
 
     st.download_button(
         label=label,
-        data=path.read_bytes(),
+        data=_csv_bytes(df),
         file_name=safe_name,
         mime=mime,
         key=key,
@@ -552,9 +770,15 @@ def _download_packet(artifact_map: Dict[str, pd.DataFrame], fig_map: Optional[Di
         st.caption("No artifacts available to export.")
         return
 
-    SAFE_EXPORT_DIR.mkdir(parents=True, exist_ok=True)
     safe_name = sanitize_filename("instructor_packet.zip")
-    packet_path = build_export_path(SAFE_EXPORT_DIR, safe_name)
+    key = f"packet_{abs(hash(label))}"
+
+    # Zipping every artifact is only worth doing once someone asks for the packet; main() clears
+    # the flag when the data source changes.
+    if st.button("Prepare instructor packet", key=f"{key}_prepare"):
+        st.session_state["packet_requested"] = True
+    if not st.session_state.get("packet_requested"):
+        return
 
     buffer = BytesIO()
     with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
@@ -562,41 +786,46 @@ def _download_packet(artifact_map: Dict[str, pd.DataFrame], fig_map: Optional[Di
             if df is None or getattr(df, "empty", False):
                 continue
             safe = sanitize_filename(f"{name}.csv")
-            zf.writestr(safe, df.to_csv(index=False))
+            # Same cached bytes as the per-table download buttons, so frames are serialized once.
+            zf.writestr(safe, _csv_bytes(df))
 
         if fig_map:
             for name, fig in fig_map.items():
                 if fig is None:
                     continue
                 try:
-                    png = fig.to_image(format="png")
+                    png = _fig_png(fig.to_json())
                     zf.writestr(sanitize_filename(f"{name}.png"), png)
                 except Exception:
                     # If image export fails, skip quietly
                     continue
 
-    packet_path.write_bytes(buffer.getvalue())
-
     st.download_button(
         label,
-        data=packet_path.read_bytes(),
+        data=buffer.getvalue(),
         file_name=safe_name,
         mime="application/zip",
         use_container_width=False,
-        key=f"packet_{abs(hash(label))}",
+        key=key,
     )
 
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _fig_png(fig_json: str) -> bytes:
+    """Render a figure to PNG via Kaleido, cached on the figure JSON so unchanged charts render once."""
+    import plotly.io as pio
+
+    return pio.from_json(fig_json).to_image(format="png")
+
+
 def _download_fig(label: str, fig, filename: str):
     if fig is None or not fig.data:
         st.caption("No chart to export")
         return
     try:
-        SAFE_EXPORT_DIR.mkdir(parents=True, exist_ok=True)
         safe_name = sanitize_filename(filename)
-        payload = fig.to_image(format="png")
-        path = build_export_path(SAFE_EXPORT_DIR, safe_name)
-        path.write_bytes(payload)
-        st.download_button(label, path.read_bytes(), file_name=safe_name, mime="image/png", key=f"dl_png_{filename}_{abs(hash(label))}")
+        payload = _fig_png(fig.to_json())
+        st.download_button(label, payload, file_name=safe_name, mime="image/png", key=f"dl_png_{filename}_{abs(hash(label))}")
     except Exception as exc:  # pragma: no cover - GUI only
         st.warning(f"Unable to export chart: {exc}")
 
@@ -614,6 +843,18 @@ def _style_fig(fig, title: Optional[str] = None):
     return fig
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def _bar_figure(frame: pd.DataFrame, x: str, y: str, labels: Dict[str, str], title: str, hovertemplate: str):
+    """Styled bar chart of ``frame``, cached so reruns over the same aggregate skip Plotly Express."""
+    # Plotly Express is imported on first chart rather than at startup.
+    import plotly.express as px
+
+    fig = px.bar(frame, x=x, y=y, labels=labels, title=title)
+    fig.update_traces(hovertemplate=hovertemplate)
+    return _style_fig(fig)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
 def _generate_pdf_report(top_issues: pd.DataFrame, persistence: pd.DataFrame, recs: Optional[pd.DataFrame]):
     try:
         from reportlab.lib.pagesizes import letter
@@ -654,24 +895,24 @@ def _generate_pdf_report(top_issues: pd.DataFrame, persistence: pd.DataFrame, re
     if top_issues is None or top_issues.empty:
         line("No rubric issues available.")
     else:
-        for _, row in top_issues.head(8).iterrows():
-            line(f"- {row['rubric_item']} | rows {int(row['count_rows'])} | students {int(row['students_affected'])} | pts {row['points_lost_total']:.1f}")
+        for row in top_issues.head(8).itertuples(index=False):
+            line(f"- {row.rubric_item} | rows {int(row.count_rows)} | students {int(row.students_affected)} | pts {row.points_lost_total:.1f}")
 
     y -= 10
     header("Persistence")
     if persistence is None or persistence.empty:
         line("Not enough exams to compute persistence.")
     else:
-        for _, row in persistence.head(6).iterrows():
-            line(f"- {row['rubric_item']}: cohort {int(row['cohort_size'])}, repeated {int(row['repeated'])}, rate {row['persistence_rate']:.1%}")
+        for row in persistence.head(6).itertuples(index=False):
+            line(f"- {row.rubric_item}: cohort {int(row.cohort_size)}, repeated {int(row.repeated)}, rate {row.persistence_rate:.1%}")
 
     y -= 10
     header("Recommendations")
     if recs is None or recs.empty:
         line("No recommendations available.")
     else:
-        for _, row in recs.head(6).iterrows():
-            line(f"- {row['action']} {row['concept']} (impact {row['impact_score']:.1f}, students {int(row['students'])}, pts {row['points_lost_total']:.1f})")
+        for row in recs.head(6).itertuples(index=False):
+            line(f"- {row.action} {row.concept} (impact {row.impact_score:.1f}, students {int(row.students)}, pts {row.points_lost_total:.1f})")
 
     c.showPage()
     c.save()
@@ -701,12 +942,12 @@ def _set_rubric_selection(rubric: Optional[str]):
 def _drilldown_selector(errors_df: pd.DataFrame):
     st.markdown("**Drill into a rubric item**")
     cols = st.columns(3)
-    for idx, (_, row) in enumerate(errors_df.head(9).iterrows()):
+    for idx, row in enumerate(errors_df.head(9).itertuples(index=False)):
         target_col = cols[idx % 3]
         with target_col:
-            label = f"{row['rubric_item']} ({int(row['count_rows'])} rows)"
+            label = f"{row.rubric_item} ({int(row.count_rows)} rows)"
             if st.button(label, key=f"rubric-select-{idx}"):
-                _set_rubric_selection(row["rubric_item"])
+                _set_rubric_selection(row.rubric_item)
     current = st.session_state.get("selected_rubric")
     if current:
         st.success(f"Filter applied: rubric item = '{current}'")
@@ -716,42 +957,89 @@ def _drilldown_selector(errors_df: pd.DataFrame):
         st.caption("No filter applied")
 
 
-def _instructor_summary(df: pd.DataFrame, errors: pd.DataFrame, persistence: pd.DataFrame):
+def _instructor_summary(errors_by_points: pd.DataFrame, persistence: pd.DataFrame, concept_stats: pd.DataFrame):
     with card("Instructor summary", "Quick signals to help plan recitations"):
+        # Each list is one markdown element rather than one st.write per row.
         high_persistence = persistence[persistence["cohort_size"] >= 3].sort_values("persistence_rate", ascending=False).head(3)
-        high_points = errors.sort_values("points_lost_total", ascending=False).head(3)
-
-        concept_df = df.copy()
-        concept_df.loc[:, "concept"] = concept_df.get("concept", concept_df.get("topic", "")).fillna("").astype(str).str.strip()
-        concept_rollup = concept_df[concept_df["concept"] != ""]
-        concept_summary = pd.DataFrame()
-        if not concept_rollup.empty:
-            concept_summary = concept_rollup.groupby("concept", dropna=False)["points_lost"].sum().reset_index().sort_values("points_lost", ascending=False).head(3)
+        # errors_by_points and concept_stats are both already sorted by total points lost.
+        high_points = errors_by_points.head(3)
+        concept_summary = concept_stats.head(3)
 
         st.markdown("**High-persistence rubric items**")
         if high_persistence.empty:
             st.caption("No repeated rubric items detected yet.")
         else:
-            for _, row in high_persistence.iterrows():
-                st.write(f"- {row['rubric_item']}: {row['persistence_rate']:.1%} repeat rate across {int(row['cohort_size'])} students")
+            st.markdown(
+                "\n".join(
+                    f"- {row.rubric_item}: {row.persistence_rate:.1%} repeat rate across {int(row.cohort_size)} students"
+                    for row in high_persistence.itertuples(index=False)
+                )
+            )
 
         st.markdown("**Highest impact deductions**")
         if high_points.empty:
             st.caption("Upload data to see deductions.")
         else:
-            for _, row in high_points.iterrows():
-                st.write(f"- {row['rubric_item']}: {row['points_lost_total']:.1f} points lost total")
+            st.markdown(
+                "\n".join(
+                    f"- {row.rubric_item}: {row.points_lost_total:.1f} points lost total"
+                    for row in high_points.itertuples(index=False)
+                )
+            )
 
         st.markdown("**Suggested recitation topics**")
         if concept_summary.empty:
             st.caption("No concepts available; add topics or map rubric items to concepts.")
         else:
-            for _, row in concept_summary.iterrows():
-                st.write(f"- {row['concept']}: {row['points_lost']:.1f} points lost")
+            st.markdown(
+                "\n".join(
+                    f"- {row.concept}: {row.points_lost_total:.1f} points lost"
+                    for row in concept_summary.itertuples(index=False)
+                )
+            )
+
+
+def _scope_kpis(df: pd.DataFrame) -> Dict[str, float]:
+    """Overview KPIs that follow the rubric drilldown: points totals, per-student spread, item count."""
+    points_lost = _points_lost(df)
+    per_student = points_lost.groupby(df["student_id"], sort=False, observed=True).sum()
+    return {
+        "total_points": points_lost.sum(),
+        "avg_per_student": per_student.mean() if not per_student.empty else 0.0,
+        "std_per_student": per_student.std(ddof=0) if len(per_student) > 0 else 0.0,
+        "rubric_items": df["rubric_item"].nunique(),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _analytics_bundle(_df: pd.DataFrame, scope_key: Tuple, exam_order: List[str]) -> SimpleNamespace:
+    """Every aggregate shared by the explore views, computed once per filtered frame.
+
+    Panels read their tables from the bundle. ``scope_key`` (see _scope_key) identifies ``_df``,
+    so a rerun finds the bundle without hashing the frame. A SimpleNamespace rather than a
+    dataclass: a class defined in this script is redefined on every rerun and would not survive
+    the cache's pickle round-trip.
+    """
+    clusters, similarities = _misconception_clusters(_df)
+    return SimpleNamespace(
+        summary=metrics.overall_summary(_df),
+        scope_kpis=_scope_kpis(_df),
+        errors=metrics.summarize_errors(_df),
+        persistence=metrics.compute_persistence(_df, exam_order=exam_order),
+        error_by_exam=metrics.error_by_exam(_df),
+        exam_changes=metrics.exam_changes(_df, exam_order=exam_order),
+        concept_stats=_concept_stats(_df),
+        section_stats=metrics.group_comparison(_df, "section_id", missing_label="Unassigned section"),
+        ta_stats=metrics.group_comparison(_df, "ta_id", missing_label="Unassigned TA"),
+        clusters=clusters,
+        similarities=similarities,
+    )
 
 
 def _render_overview(
     df: pd.DataFrame,
+    bundle: SimpleNamespace,
+    scope_key: Tuple,
     exam_order: List[str],
     allowed_concepts: List[str],
     include_unmapped: bool,
@@ -761,91 +1049,91 @@ def _render_overview(
         st.info("No data available for the selected students.")
         return
 
-    summary = metrics.overall_summary(df)
-    errors = metrics.summarize_errors(df)
+    summary = bundle.summary
+    errors = bundle.errors
     selected = st.session_state.get("selected_rubric")
 
-    filtered_df = df.copy()
+    filtered_df = df
     if selected:
-        filtered_df = filtered_df.loc[filtered_df["rubric_item"] == selected]
+        filtered_df = df.loc[df["rubric_item"] == selected]
         errors = errors.loc[errors["rubric_item"] == selected]
+    # One descending sort per ordering: the top table, points chart, instructor summary and exports
+    # share the points order; the count chart uses the count order.
+    errors_by_points = errors.sort_values("points_lost_total", ascending=False)
+    errors_by_count = errors.sort_values("count_rows", ascending=False)
 
-    total_points = filtered_df["points_lost"].sum()
-    numeric = filtered_df.copy()
-    numeric.loc[:, "points_lost"] = pd.to_numeric(numeric["points_lost"], errors="coerce")
-    per_student = numeric.groupby("student_id")["points_lost"].sum()
-    avg_per_student = per_student.mean() if not per_student.empty else 0.0
-    std_per_student = per_student.std(ddof=0) if len(per_student) > 0 else 0.0
+    # With no rubric selected the scope is the bundle's frame, whose KPIs are already cached.
+    scope = _scope_kpis(filtered_df) if selected else bundle.scope_kpis
 
     kpis = [
         {"label": "Rows", "value": f"{summary['rows']:,}"},
         {"label": "Students", "value": f"{summary['students']:,}"},
-        {"label": "Avg pts / student", "value": f"{avg_per_student:.2f}"},
-        {"label": "Std dev / student", "value": f"{std_per_student:.2f}"},
+        {"label": "Avg pts / student", "value": f"{scope['avg_per_student']:.2f}"},
+        {"label": "Std dev / student", "value": f"{scope['std_per_student']:.2f}"},
         {"label": "Exams", "value": summary["exams"], "hint": "Unique exam_id"},
-        {"label": "Rubric items", "value": filtered_df["rubric_item"].nunique()},
+        {"label": "Rubric items", "value": scope["rubric_items"]},
         {"label": "Avg points lost", "value": f"{summary['avg_points_lost']:.2f}"},
-        {"label": "Total points lost", "value": f"{total_points:.1f}"},
+        {"label": "Total points lost", "value": f"{scope['total_points']:.1f}"},
     ]
     kpi_row(kpis)
     st.caption("Avg/Std dev per student are computed on total points lost per student in the current scope.")
 
-    persistence = metrics.compute_persistence(df, exam_order=exam_order)
+    persistence = bundle.persistence
     col_left, col_right = st.columns([0.65, 0.35])
     with col_left:
         section_header("Top rubric items")
         if errors.empty:
             st.info("No rubric items available yet. Check mappings or upload a dataset with rubric rows.")
         else:
-            top_by_points = errors.sort_values("points_lost_total", ascending=False).head(10)
+            top_by_points = errors_by_points.head(10)
             st.dataframe(top_by_points, use_container_width=True, height=280)
             _download_df("Download points-lost CSV", top_by_points, "top_rubric_points.csv")
     with col_right:
         if personal_mode:
             st.info("Personal mode: instructor summaries are hidden when fewer than 5 students are present.")
         else:
-            _instructor_summary(df, errors, persistence)
+            _instructor_summary(errors_by_points, persistence, bundle.concept_stats)
 
     st.subheader("Concepts")
-    concept_stats = _concept_stats(df)
+    concept_stats = bundle.concept_stats
     if concept_stats.empty:
         st.info("Add topics or concept mappings to see concept-level analytics.")
     else:
         st.dataframe(concept_stats, use_container_width=True, height=260)
         _download_df("Download concepts CSV", concept_stats, "concepts.csv")
-        concept_fig = px.bar(
-            concept_stats.sort_values("points_lost_total", ascending=False),
+        # _concept_stats already orders concepts by points lost.
+        concept_fig = _bar_figure(
+            concept_stats[["concept", "points_lost_total"]],
             x="concept",
             y="points_lost_total",
             labels={"concept": "Concept", "points_lost_total": "Total points lost"},
             title="Points lost by concept",
+            hovertemplate="<b>%{x}</b><br>Total points lost: %{y}<extra></extra>",
         )
-        concept_fig.update_traces(hovertemplate="<b>%{x}</b><br>Total points lost: %{y}<extra></extra>")
-        _style_fig(concept_fig)
         st.plotly_chart(concept_fig, use_container_width=True)
 
     st.divider()
-    _render_course_structure(df)
+    _render_course_structure(bundle)
 
     st.divider()
-    _render_misconceptions(df)
+    _render_misconceptions(bundle)
 
     st.divider()
     rec_df = None
     if personal_mode:
         st.info("Recommendations hidden in personal mode (fewer than 5 students).")
     else:
-        rec_df = _render_recommendations(df, exam_order, allowed_concepts, include_unmapped)
+        rec_df = _render_recommendations(df, scope_key, exam_order, allowed_concepts, include_unmapped)
 
     st.divider()
     if personal_mode:
         st.info("Exports are limited in personal mode; instructor reports are hidden when the dataset is very small.")
-        _render_exports(df, errors, persistence, None)
+        _render_exports(df, errors_by_points, persistence, None)
     else:
-        _render_exports(df, errors, persistence, rec_df)
+        _render_exports(df, errors_by_points, persistence, rec_df)
 
     st.divider()
-    _render_predictive(df, exam_order)
+    _render_predictive(df, exam_order, personal_mode=personal_mode)
 
     st.divider()
     _drilldown_selector(errors)
@@ -854,27 +1142,25 @@ def _render_overview(
     if not errors.empty:
         chart_col1, chart_col2 = st.columns(2)
         with chart_col1:
-            count_fig = px.bar(
-                errors.sort_values("count_rows", ascending=False),
+            count_fig = _bar_figure(
+                errors_by_count[["rubric_item", "count_rows"]],
                 x="rubric_item",
                 y="count_rows",
                 labels={"rubric_item": "Rubric item", "count_rows": "Row count"},
                 title="Occurrences by rubric item",
+                hovertemplate="<b>%{x}</b><br>Rows: %{y}<extra></extra>",
             )
-            count_fig.update_traces(hovertemplate="<b>%{x}</b><br>Rows: %{y}<extra></extra>")
-            _style_fig(count_fig)
             st.plotly_chart(count_fig, use_container_width=True)
             _download_fig("Export count bar (PNG)", count_fig, "rubric_counts.png")
         with chart_col2:
-            points_fig = px.bar(
-                errors.sort_values("points_lost_total", ascending=False),
+            points_fig = _bar_figure(
+                errors_by_points[["rubric_item", "points_lost_total"]],
                 x="rubric_item",
                 y="points_lost_total",
                 labels={"rubric_item": "Rubric item", "points_lost_total": "Total points lost"},
                 title="Points lost by rubric item",
+                hovertemplate="<b>%{x}</b><br>Total points lost: %{y}<extra></extra>",
             )
-            points_fig.update_traces(hovertemplate="<b>%{x}</b><br>Total points lost: %{y}<extra></extra>")
-            _style_fig(points_fig)
             st.plotly_chart(points_fig, use_container_width=True)
             _download_fig("Export points bar (PNG)", points_fig, "rubric_points_total.png")
 
@@ -882,12 +1168,17 @@ def _render_overview(
     if selected:
         st.caption(f"Filtered by rubric item: {selected}")
     st.dataframe(filtered_df.head(200), use_container_width=True, height=320)
-    _download_df("Download normalized dataset (CSV)", df, "normalized.csv")
+    # Serializing (and hashing, for the cache key) the whole dataset is the costliest download on the
+    # page, so it only happens once asked for; later reruns reuse the cached bytes.
+    if st.button("Prepare normalized dataset (CSV)"):
+        st.session_state["normalized_csv_requested"] = True
+    if st.session_state.get("normalized_csv_requested"):
+        _download_df("Download normalized dataset (CSV)", df, "normalized.csv")
 
 
-def _render_misconceptions(df: pd.DataFrame):
+def _render_misconceptions(bundle: SimpleNamespace):
     st.subheader("Misconception clusters")
-    clusters, sim_df = _misconception_clusters(df)
+    clusters, sim_df = bundle.clusters, bundle.similarities
 
     if not clusters:
         st.info("Not enough co-occurrence data yet; upload more students or exams to see clusters.")
@@ -906,84 +1197,96 @@ def _render_misconceptions(df: pd.DataFrame):
     if sim_df.empty:
         st.caption("No similarity pairs available yet.")
     else:
-        top_pairs = sim_df.head(20).copy()
-        top_pairs.loc[:, "jaccard"] = top_pairs["jaccard"].round(3)
-        top_pairs.loc[:, "corr"] = top_pairs["corr"].round(3)
+        top_pairs = sim_df.head(20).round({"jaccard": 3, "corr": 3})
         st.dataframe(top_pairs, use_container_width=True, height=320)
         _download_df("Download co-occurrence pairs", top_pairs, "cooccurrence_pairs.csv")
 
 
 def _build_predictive_frames(df: pd.DataFrame, exam_order: List[str]):
-    data = df.copy()
-    data.loc[:, "rubric_item"] = data["rubric_item"].fillna("").astype(str).str.strip()
-    data.loc[:, "concept"] = data.get("concept", "").fillna("").astype(str).str.strip()
-    data.loc[:, "points_lost"] = pd.to_numeric(data["points_lost"], errors="coerce").fillna(0)
-    data.loc[:, "exam_id"] = data["exam_id"].astype(str)
-    data.loc[:, "student_id"] = data["student_id"].astype(str)
+    # Plain string keys for the visit/item lookups below, on a shallow copy since every column used
+    # is replaced.
+    data = df.copy(deep=False)
+    data["rubric_item"] = _category_text(data["rubric_item"], missing="", strip=True)
+    data["concept"] = data.get("concept", "").fillna("").astype(str).str.strip()
+    data["points_lost"] = _points_lost(data).fillna(0)
+    data["exam_id"] = _category_text(data["exam_id"])
+    data["student_id"] = _category_text(data["student_id"])
 
     items = sorted(data["rubric_item"].unique())
-    concept_for_item = (
-        data.groupby("rubric_item")["concept"].agg(lambda s: s.mode().iat[0] if not s.mode().empty else "")
-    ).to_dict()
+    # Most common concept per item; idxmax over the (item, concept)-sorted counts picks the
+    # alphabetically first concept on ties, as Series.mode() did.
+    pair_counts = data.groupby(["rubric_item", "concept"]).size()
+    concept_for_item = dict(pair_counts.groupby(level="rubric_item").idxmax().tolist())
 
-    exam_rank = {exam: idx for idx, exam in enumerate(exam_order)}
-    training_rows = []
-    scoring_rows = []
-
-    for student_id, sub in data.groupby("student_id"):
-        exams = sorted(sub["exam_id"].unique(), key=lambda x: exam_rank.get(x, 1e9))
-        if len(exams) < 1:
-            continue
-
-        # Build cumulative prior for scoring on last exam (predict next)
-        for idx in range(1, len(exams)):
-            current_exam = exams[idx]
-            prior_exams = set(exams[:idx])
-            prior_df = sub[sub["exam_id"].isin(prior_exams)]
-            current_df = sub[sub["exam_id"] == current_exam]
-
-            current_items = set(current_df["rubric_item"].unique())
-            for item in items:
-                concept = concept_for_item.get(item, "")
-                prior_seen = 1 if item in set(prior_df["rubric_item"].unique()) else 0
-                prior_concept_pts = (
-                    prior_df.loc[prior_df["concept"] == concept, "points_lost"].sum() if concept else 0.0
-                )
-                label = 1 if item in current_items else 0
-                training_rows.append(
-                    {
-                        "student_id": student_id,
-                        "exam_id": current_exam,
-                        "rubric_item": item,
-                        "prior_seen": prior_seen,
-                        "prior_concept_points": prior_concept_pts,
-                        "label": label,
-                    }
-                )
-
-        # scoring using last known state
-        last_exam = exams[-1]
-        prior_exams = set(exams[:-1])
-        prior_df = sub[sub["exam_id"].isin(prior_exams)] if prior_exams else sub.iloc[0:0]
-        for item in items:
-            concept = concept_for_item.get(item, "")
-            prior_seen = 1 if item in set(prior_df["rubric_item"].unique()) else 0
-            prior_concept_pts = prior_df.loc[prior_df["concept"] == concept, "points_lost"].sum() if concept else 0.0
-            scoring_rows.append(
-                {
-                    "student_id": student_id,
-                    "rubric_item": item,
-                    "prior_seen": prior_seen,
-                    "prior_concept_points": prior_concept_pts,
-                }
-            )
+    if data.empty:
+        return pd.DataFrame(), pd.DataFrame(), items
 
-    train_df = pd.DataFrame(training_rows)
-    score_df = pd.DataFrame(scoring_rows)
+    # One row per (student, exam) visit, ordered by student id and then by exam rank; exams missing
+    # from exam_order sort last in first-seen order.
+    exam_rank = {exam: idx for idx, exam in enumerate(exam_order)}
+    visits = data[["student_id", "exam_id"]].drop_duplicates()
+    rank = visits["exam_id"].map(exam_rank).fillna(len(exam_order)).to_numpy(dtype=np.int32)
+    # Sorted factorize codes order students like their ids; lexsort is stable, so exam ties keep
+    # first-seen order.
+    student_codes = pd.factorize(visits["student_id"], sort=True)[0]
+    order = np.lexsort((rank, student_codes))
+    visits = visits.iloc[order].reset_index(drop=True)
+    student_codes = student_codes[order]
+    is_first = np.r_[True, student_codes[1:] != student_codes[:-1]]
+    is_last = np.r_[student_codes[1:] != student_codes[:-1], True]
+
+    # Visit x item presence and visit x concept points, then running totals over each student's
+    # earlier visits: the features the model sees for the next exam.
+    row_visit = pd.MultiIndex.from_frame(visits[["student_id", "exam_id"]]).get_indexer(
+        pd.MultiIndex.from_frame(data[["student_id", "exam_id"]])
+    )
+    items_arr = np.array(items, dtype=object)
+    seen = np.zeros((len(visits), len(items)), dtype=np.int8)
+    seen[row_visit, pd.Index(items_arr).get_indexer(data["rubric_item"])] = 1
+    concept_codes, concepts = pd.factorize(data["concept"])
+    concept_points = np.zeros((len(visits), len(concepts)))
+    np.add.at(concept_points, (row_visit, concept_codes), data["points_lost"].to_numpy(dtype=np.float64))
+
+    def _prior_totals(values: np.ndarray, how: str) -> np.ndarray:
+        running = pd.DataFrame(values, copy=False).groupby(student_codes).transform(how)
+        return running.groupby(student_codes).shift(1, fill_value=0).to_numpy()
+
+    # cummax keeps the 0/1 presence flags in int8 however many exams a student has.
+    prior_seen = _prior_totals(seen, "cummax")
+    item_concepts = pd.Index([concept_for_item.get(item, "") for item in items], dtype=object)
+    # Totals accumulate in float64 and are stored as float32, halving the (visit, item) feature column;
+    # float32 is exact for the half- and quarter-point totals rubrics produce.
+    prior_points = _prior_totals(concept_points, "cumsum")[:, concepts.get_indexer(item_concepts)].astype(np.float32)
+    prior_points[:, item_concepts == ""] = 0.0
+
+    def _item_rows(rows: np.ndarray, **extra: np.ndarray) -> pd.DataFrame:
+        """Expand visit rows into one row per (visit, item), items varying fastest."""
+        columns = {
+            "student_id": np.repeat(visits["student_id"].to_numpy()[rows], len(items)),
+            **{name: np.repeat(values[rows], len(items)) for name, values in extra.items()},
+            "rubric_item": np.tile(items_arr, len(rows)),
+            "prior_seen": prior_seen[rows].ravel(),
+            "prior_concept_points": prior_points[rows].ravel(),
+        }
+        return pd.DataFrame(columns, copy=False)
+
+    # Every exam after a student's first is a training example; the latest exam's priors (the exams
+    # before it) are the scoring features.
+    train_rows = np.flatnonzero(~is_first)
+    train_df = pd.DataFrame()
+    if len(train_rows) and items:
+        train_df = _item_rows(train_rows, exam_id=visits["exam_id"].to_numpy())
+        train_df["label"] = seen[train_rows].ravel()
+
+    score_df = pd.DataFrame()
+    if items:
+        score_df = _item_rows(np.flatnonzero(is_last))
     return train_df, score_df, items
 
 
+@st.cache_data(show_spinner=False, max_entries=8)
 def _predict_future_risks(df: pd.DataFrame, exam_order: List[str]):
+    """Fit the risk model and score each student's next exam, cached so reruns skip the sklearn fit."""
     try:
         from sklearn.linear_model import LogisticRegression
     except Exception as exc:  # pragma: no cover - defensive
@@ -993,20 +1296,25 @@ def _predict_future_risks(df: pd.DataFrame, exam_order: List[str]):
     if train_df.empty or score_df.empty:
         return None, None, "Not enough exam history to train (need at least 2 exams with students)."
 
-    X = train_df[["prior_seen", "prior_concept_points"]]
-    y = train_df["label"]
+    # Training rows repeat a handful of distinct feature pairs, so fit on one weighted row per
+    # (features, label) instead: the weighted log-likelihood is the same as over the full frame.
+    features = ["prior_seen", "prior_concept_points"]
+    counts = train_df.groupby(features, sort=False)["label"].agg(["sum", "size"])
+    distinct = counts.index.to_frame(index=False)
+    X = pd.concat([distinct, distinct], ignore_index=True)
+    y = np.r_[np.ones(len(counts), dtype=np.int64), np.zeros(len(counts), dtype=np.int64)]
+    weight = np.r_[counts["sum"].to_numpy(), (counts["size"] - counts["sum"]).to_numpy()].astype(np.float64)
+    present = weight > 0
     model = LogisticRegression(max_iter=200)
     try:
-        model.fit(X, y)
+        model.fit(X[present], y[present], sample_weight=weight[present])
     except Exception as exc:  # pragma: no cover - defensive
         return None, None, f"Model training failed: {exc}"
 
     score_probs = model.predict_proba(score_df[["prior_seen", "prior_concept_points"]])[:, 1]
-    score_df = score_df.copy()
-    score_df.loc[:, "probability"] = score_probs
-    score_df.loc[:, "confidence"] = score_df["probability"].apply(
-        lambda p: "high" if p >= 0.7 else ("medium" if p >= 0.4 else "low")
-    )
+    # score_df was built fresh by _build_predictive_frames, so the columns can be added in place.
+    score_df["probability"] = score_probs
+    score_df["confidence"] = np.select([score_probs >= 0.7, score_probs >= 0.4], ["high", "medium"], default="low").astype(object)
 
     coef_df = pd.DataFrame(
         {
@@ -1018,17 +1326,27 @@ def _predict_future_risks(df: pd.DataFrame, exam_order: List[str]):
     return score_df, coef_df, None
 
 
-def _render_recommendations(df: pd.DataFrame, exam_order: List[str], allowed_concepts: List[str], include_unmapped: bool):
-    st.subheader("What to change next week")
-
-    rec_df = compute_recommendations(
-        df,
+@st.cache_data(show_spinner=False, max_entries=8)
+def _recommendations(
+    _df: pd.DataFrame, scope_key: Tuple, exam_order: List[str], allowed_concepts: Tuple[str, ...], include_unmapped: bool
+) -> pd.DataFrame:
+    """Concept recommendations for the scoped frame; like _analytics_bundle, ``scope_key`` stands in for ``_df``."""
+    return compute_recommendations(
+        _df,
         exam_order=exam_order,
         allowed_concepts=allowed_concepts,
         top_n=5,
         include_unmapped=include_unmapped,
         unmapped_label="Unmapped",
     )
+
+
+def _render_recommendations(
+    df: pd.DataFrame, scope_key: Tuple, exam_order: List[str], allowed_concepts: List[str], include_unmapped: bool
+):
+    st.subheader("What to change next week")
+
+    rec_df = _recommendations(df, scope_key, exam_order, tuple(allowed_concepts), include_unmapped)
     if rec_df.empty:
         st.info("No valid concepts available for recommendations; add topics or concept mappings.")
         return None
@@ -1052,10 +1370,18 @@ def _render_recommendations(df: pd.DataFrame, exam_order: List[str], allowed_con
     return rec_df
 
 
-def _render_predictive(df: pd.DataFrame, exam_order: List[str]):
+def _render_predictive(df: pd.DataFrame, exam_order: List[str], personal_mode: bool = False):
     st.subheader("Predictive analytics (interpretable)")
     st.caption("Uses logistic regression with prior misses and concept points; predictions are probabilistic and uncertain.")
 
+    if personal_mode:
+        st.info("Predictive analytics hidden in personal mode (fewer than 5 students).")
+        return
+    # Training needs some student seen in two exams; skip building the frames when that cannot happen.
+    if df["exam_id"].nunique() < 2:
+        st.info("Not enough exam history to train (need at least 2 exams with students).")
+        return
+
     score_df, coef_df, warn = _predict_future_risks(df, exam_order)
     if warn:
         st.info(warn)
@@ -1067,46 +1393,40 @@ def _render_predictive(df: pd.DataFrame, exam_order: List[str]):
 
     st.markdown("**Model coefficients (interpretability)**")
     if coef_df is not None and not coef_df.empty:
-        coef_df = coef_df.copy()
-        coef_df.loc[:, "coefficient"] = coef_df["coefficient"].round(3)
+        coef_df = coef_df.round({"coefficient": 3})
         st.dataframe(coef_df, use_container_width=True, height=120)
     else:
         st.caption("Coefficients unavailable.")
 
     st.markdown("**Per-student predicted risks (next exam)**")
-    risk_table = score_df.copy()
-    risk_table.loc[:, "probability"] = risk_table["probability"].round(3)
-    risk_table = risk_table.sort_values(by="probability", ascending=False)
+    # score_df is this rerun's own copy of the cached result, so round it in place instead of copying.
+    score_df["probability"] = score_df["probability"].round(3)
+    risk_table = score_df.sort_values(by="probability", ascending=False)
     st.dataframe(risk_table.head(50), use_container_width=True, height=360)
     _download_df("Download risk table", risk_table, "predicted_risks.csv")
 
     st.caption("Disclaimer: These probabilities are estimates based on limited history; treat as guidance, not guarantees.")
 
 
-def _top_concepts(df: pd.DataFrame, limit: int = 5) -> pd.DataFrame:
-    concept_stats = _concept_stats(df)
+def _top_concepts(concept_stats: pd.DataFrame, limit: int = 5) -> pd.DataFrame:
     if concept_stats.empty:
         return concept_stats
-    concept_stats = concept_stats.copy()
-    concept_stats.loc[:, "impact_score"] = concept_stats["points_lost_total"] * concept_stats["students_affected"].clip(lower=1)
+    concept_stats = concept_stats.assign(
+        impact_score=concept_stats["points_lost_total"] * concept_stats["students_affected"].clip(lower=1)
+    )
     return concept_stats.sort_values(by="impact_score", ascending=False).head(limit)
 
 
-def _top_persistent_concepts(df: pd.DataFrame, exam_order: List[str], limit: int = 5) -> pd.DataFrame:
-    persistence = metrics.compute_persistence(df, exam_order=exam_order)
+def _top_persistent_concepts(persistence: pd.DataFrame, limit: int = 5) -> pd.DataFrame:
     if persistence.empty:
         return persistence
     return persistence.sort_values(by=["persistence_rate", "cohort_size"], ascending=[False, False]).head(limit)
 
 
-def _exam_change_table(df: pd.DataFrame, exam_order: List[str]) -> pd.DataFrame:
-    changes = metrics.exam_changes(df, exam_order=exam_order)
+def _exam_change_table(changes: pd.DataFrame) -> pd.DataFrame:
     if changes.empty:
         return changes
-    changes = changes.copy()
-    changes.loc[:, "delta_vs_prev"] = changes["delta_vs_prev"].fillna(0.0).round(2)
-    changes.loc[:, "pct_change_vs_prev"] = changes["pct_change_vs_prev"].fillna(0.0).round(3)
-    return changes
+    return changes.fillna({"delta_vs_prev": 0.0, "pct_change_vs_prev": 0.0}).round({"delta_vs_prev": 2, "pct_change_vs_prev": 3})
 
 
 def _lesson_plan_suggestions(top_concepts: pd.DataFrame, top_persist: pd.DataFrame) -> List[str]:
@@ -1127,14 +1447,14 @@ def _lesson_plan_suggestions(top_concepts: pd.DataFrame, top_persist: pd.DataFra
     return suggestions
 
 
-def _render_instructor_summary(df: pd.DataFrame, exam_order: List[str], personal_mode: bool):
+def _render_instructor_summary(bundle: SimpleNamespace, personal_mode: bool):
     st.subheader("Instructor Summary")
     if personal_mode:
         st.info("Personal mode: metrics are shown for transparency; avoid sharing externally when cohort < 5.")
 
-    top_concepts = _top_concepts(df)
-    top_persist = _top_persistent_concepts(df, exam_order)
-    exam_changes = _exam_change_table(df, exam_order)
+    top_concepts = _top_concepts(bundle.concept_stats)
+    top_persist = _top_persistent_concepts(bundle.persistence)
+    exam_changes = _exam_change_table(bundle.exam_changes)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -1175,7 +1495,30 @@ def _render_instructor_summary(df: pd.DataFrame, exam_order: List[str], personal
     _download_packet(artifacts, fig_map=None, label="Download instructor packet (ZIP)")
 
 
-def _render_persistence(df: pd.DataFrame, exam_order: List[str], personal_mode: bool = False):
+@st.cache_data(show_spinner=False, max_entries=8)
+def _occurrence_heatmap(pivot: pd.DataFrame):
+    """Rubric item x exam count heatmap, cached on the pivot so reruns reuse the figure."""
+    import plotly.express as px
+
+    heatmap = px.imshow(
+        pivot,
+        text_auto=True,
+        aspect="auto",
+        color_continuous_scale="Blues",
+        title="Count of rubric items per exam",
+        labels={"color": "Count"},
+    )
+    heatmap.update_layout(
+        margin=dict(t=60, r=30, b=40, l=40),
+        font=dict(color="#e5e7eb"),
+        paper_bgcolor="#0b1220",
+        plot_bgcolor="#0b1220",
+        coloraxis_colorbar=dict(title="Count", bgcolor="#0b1220"),
+    )
+    return heatmap
+
+
+def _render_persistence(df: pd.DataFrame, bundle: SimpleNamespace, exam_order: List[str], personal_mode: bool = False):
     if personal_mode:
         st.info("Persistence is hidden in personal mode (fewer than 5 students).")
         return
@@ -1183,8 +1526,7 @@ def _render_persistence(df: pd.DataFrame, exam_order: List[str], personal_mode:
         st.info("Need at least two exams to compute persistence and trajectories.")
         return
 
-    persistence = metrics.compute_persistence(df, exam_order=exam_order)
-    persistence = persistence.sort_values(by="persistence_rate", ascending=False)
+    persistence = bundle.persistence.sort_values(by="persistence_rate", ascending=False)
 
     with card("Persistence by rubric item"):
         st.dataframe(persistence, use_container_width=True, height=260)
@@ -1192,28 +1534,14 @@ def _render_persistence(df: pd.DataFrame, exam_order: List[str], personal_mode:
         _download_df("Download persistence (CSV)", persistence, "persistence.csv")
 
     st.subheader("Rubric occurrences by exam")
-    long_counts = metrics.error_by_exam(df)
+    long_counts = bundle.error_by_exam
     pivot = long_counts.pivot_table(index="rubric_item", columns="exam_id", values="count_rows", aggfunc="sum", fill_value=0)
 
     if pivot.empty:
         st.info("No rubric/exam combinations to visualize yet.")
         return
 
-    heatmap = px.imshow(
-        pivot,
-        text_auto=True,
-        aspect="auto",
-        color_continuous_scale="Blues",
-        title="Count of rubric items per exam",
-        labels={"color": "Count"},
-    )
-    heatmap.update_layout(
-        margin=dict(t=60, r=30, b=40, l=40),
-        font=dict(color="#e5e7eb"),
-        paper_bgcolor="#0b1220",
-        plot_bgcolor="#0b1220",
-        coloraxis_colorbar=dict(title="Count", bgcolor="#0b1220"),
-    )
+    heatmap = _occurrence_heatmap(pivot)
     st.plotly_chart(heatmap, use_container_width=True)
     _download_fig("Download heatmap (PNG)", heatmap, "rubric_exam_heatmap.png")
 
@@ -1230,8 +1558,7 @@ def _render_persistence(df: pd.DataFrame, exam_order: List[str], personal_mode:
     if transition_df.empty:
         st.info("No transitions available to compute conditional probabilities.")
     else:
-        top_transitions = transition_df.head(20).copy()
-        top_transitions.loc[:, "conditional_prob"] = top_transitions["conditional_prob"].round(3)
+        top_transitions = transition_df.head(20).round({"conditional_prob": 3})
         st.dataframe(top_transitions, use_container_width=True, height=320)
         _download_df("Download transitions (CSV)", top_transitions, "transitions.csv")
 
@@ -1252,14 +1579,14 @@ def _render_persistence(df: pd.DataFrame, exam_order: List[str], personal_mode:
         st.plotly_chart(fig, use_container_width=True)
 
 
-def _render_quality(df: pd.DataFrame):
+def _render_quality(df: pd.DataFrame, scope_key: Tuple, dataset_results: Optional[List[Dict[str, object]]] = None):
     section_header("Invariant checks", "Validation results for the normalized dataset")
-    results = _apply_validation(df)
+    # An unfiltered scope holds the same rows Step 3 validated, so its results are reused as-is.
+    results = dataset_results if dataset_results is not None else _apply_validation(df, scope_key)
     res_df = pd.DataFrame(results)
 
     if "detail" in res_df.columns:
-        res_df = res_df.copy()
-        res_df.loc[:, "detail"] = res_df["detail"].fillna("").astype(str)
+        res_df["detail"] = res_df["detail"].fillna("").astype(str)
 
     st.dataframe(res_df, use_container_width=True, height=220)
 
@@ -1271,28 +1598,51 @@ def _render_quality(df: pd.DataFrame):
     st.write("Rows dropped during normalization: 0 (data is validated but not dropped).")
 
 
-def _ingestion_stepper(raw_df, mapping_cfg, normalized_df, validation_results):
+def _dataset_key(mapping_cfg: Optional[MappingConfig]) -> Tuple:
+    """Identify the normalized frame: the ingested dataset and its column mapping."""
+    return (st.session_state.get("df_version"), tuple(sorted(mapping_cfg.to_dict().items())) if mapping_cfg else None)
+
+
+def _scope_key(mapping_cfg: Optional[MappingConfig], student_scope: str) -> Tuple:
+    """Identify the scoped frame by everything that produces it, for caches that skip hashing it.
+
+    The frame is a function of the ingested dataset, the column mapping, the concept mapping, the
+    anonymize toggle and the student selection; dtype optimization is deterministic.
+    """
+    concept_mapping = st.session_state.get("concept_mapping") or {}
+    return (
+        *_dataset_key(mapping_cfg),
+        tuple(sorted(concept_mapping.items())),
+        bool(st.session_state.get("anonymize_ids")),
+        student_scope,
+    )
+
+
+def _stepper_statuses(
+    has_raw: bool, needs_map: bool, has_mapping: bool, has_normalized: bool, validated: bool
+) -> Tuple[str, str, str, str]:
+    """Upload/Map/Validate/Explore step statuses, from flags main() has already worked out."""
+    upload = "done" if has_raw else "active"
+    mapping = "waiting" if not has_raw else ("done" if (has_mapping or not needs_map) else "active")
+    validate = "waiting" if not has_normalized else ("done" if validated else "active")
+    explore = "waiting" if not has_normalized else "active"
+    return upload, mapping, validate, explore
+
+
+def _ingestion_stepper(raw_df, mapping_cfg, normalized_df, validation_results, needs_map: bool):
+    upload, mapping, validate, explore = _stepper_statuses(
+        raw_df is not None, needs_map, mapping_cfg is not None, normalized_df is not None, bool(validation_results)
+    )
     steps = [
-        Step(title="Upload", description="Upload CSV or enable Demo mode", status="active" if raw_df is None else "done"),
-        Step(
-            title="Map",
-            description="Align columns to canonical schema",
-            status="waiting" if raw_df is None else ("done" if (mapping_cfg or not needs_mapping(raw_df)) else "active"),
-        ),
-        Step(
-            title="Validate",
-            description="Run invariants before exploring",
-            status="waiting" if normalized_df is None else ("done" if validation_results else "active"),
-        ),
-        Step(title="Explore", description="Overview, Persistence, Data Quality", status="waiting" if normalized_df is None else "active"),
+        Step(title="Upload", description="Upload CSV or enable Demo mode", status=upload),
+        Step(title="Map", description="Align columns to canonical schema", status=mapping),
+        Step(title="Validate", description="Run invariants before exploring", status=validate),
+        Step(title="Explore", description="Overview, Persistence, Data Quality", status=explore),
     ]
     stepper(steps)
 
 
 def main():
-    # Reset per-rerun download key counter
-    st.session_state['_dl_counter'] = 0
-
     _init_state()
     shell = AppShell("Gradescope Rubric Analytics", "Guided ingestion → validation → insights")
     shell.header(right="Modern UI beta")
@@ -1327,13 +1677,23 @@ def main():
 
     raw_df, source_label = _load_source(demo_mode, synthetic_mode, uploader)
     if raw_df is not None:
-        if source_label != st.session_state.get("source_label"):
+        # The upload's file_id tells apart two different files uploaded under the same name.
+        source_key = (source_label, getattr(uploader, "file_id", None))
+        if source_key != st.session_state.get("source_key"):
             st.session_state["mapping_cfg"] = None
             st.session_state["normalized_df"] = None
             st.session_state["validation_results"] = None
             st.session_state["selected_rubric"] = None
+            # A new dataset starts with its PDF report, instructor packet and normalized CSV unrequested.
+            st.session_state["pdf_requested"] = False
+            st.session_state["packet_requested"] = False
+            st.session_state["normalized_csv_requested"] = False
+            # New token per dataset; cached per-dataset values (widget options) key on it.
+            st.session_state["df_version"] = uuid.uuid4().hex
+            st.session_state["source_digest"] = _source_digest(demo_mode, synthetic_mode)
         st.session_state["raw_df"] = raw_df
         st.session_state["source_label"] = source_label
+        st.session_state["source_key"] = source_key
     if source_label:
         st.sidebar.success(source_label)
 
@@ -1344,13 +1704,14 @@ def main():
     mapping_cfg: Optional[MappingConfig] = st.session_state.get("mapping_cfg")
     normalized_df: Optional[pd.DataFrame] = st.session_state.get("normalized_df")
 
-    _ingestion_stepper(raw_df, mapping_cfg, normalized_df, st.session_state.get("validation_results"))
+    # One header check per rerun, shared by the stepper and the mapping step below.
+    needs_map = raw_df is not None and needs_mapping(raw_df)
+    _ingestion_stepper(raw_df, mapping_cfg, normalized_df, st.session_state.get("validation_results"), needs_map)
 
     if raw_df is None:
         _render_empty_state(shell)
         return
 
-    needs_map = needs_mapping(raw_df)
     if needs_map and mapping_cfg is None:
         section_header("Step 2 — Map columns", "Select which columns match the canonical schema")
         mapping_cfg = _mapping_wizard(raw_df)
@@ -1363,14 +1724,19 @@ def main():
         st.info("Headers match canonical schema; mapping skipped.")
 
     try:
-        normalized_df, _, _ = normalize_dataframe(raw_df, mapping=mapping_cfg, infer_mapping=mapping_cfg is None)
+        normalized_df, validation_results = _normalize_dataset(
+            raw_df,
+            st.session_state.get("df_version"),
+            mapping_cfg.to_dict() if mapping_cfg else None,
+            st.session_state.get("source_digest"),
+        )
         st.session_state["normalized_df"] = normalized_df
     except ValueError as exc:
         st.error(f"Normalization failed: {exc}")
         return
 
     section_header("Step 3 — Validate", "Run invariants to confirm the dataset is clean")
-    validation_results = _apply_validation(normalized_df)
+    st.session_state["validation_results"] = validation_results
     ok = all(res.get("ok", False) for res in validation_results)
     if ok:
         st.success("Validation passed")
@@ -1378,9 +1744,10 @@ def main():
         st.warning("Validation found issues; review before trusting analytics.")
 
     section_header("Concept normalization", "Use topics or map rubric items to concepts")
-    normalized_df = _apply_concepts(normalized_df)
+    normalized_df, concepts = _apply_concepts(normalized_df, _dataset_key(mapping_cfg))
 
     anonymize_ids = st.session_state.get("anonymize_ids", False)
+    # Concept mapping and anonymization both keep the categoricals _normalize_dataset produced.
     normalized_df = _maybe_anonymize_students(normalized_df, anonymize_ids)
     if anonymize_ids:
         st.caption("Student identifiers are anonymized across all charts and downloads.")
@@ -1391,12 +1758,7 @@ def main():
         help="Turn off to keep recommendations focused on mapped concepts."
     )
 
-    allowed_concepts = [
-        c
-        for c in normalized_df.get("concept", pd.Series([], dtype=str)).fillna("").astype(str).str.strip().unique()
-        if c and (include_unmapped or c != "Unmapped")
-    ]
-    allowed_concepts = sorted(allowed_concepts)
+    allowed_concepts = [c for c in concepts if include_unmapped or c != "Unmapped"]
 
     section_header("Student scope", "Analyze all students or a subset")
     filtered_df, student_scope_desc = _student_filter_controls(normalized_df)
@@ -1411,22 +1773,32 @@ def main():
     st.dataframe(filtered_df.head(20), use_container_width=True)
 
     section_header("Step 4 — Explore")
-    exam_order = _exam_order(filtered_df)
-    overview_tab, persistence_tab, instructor_tab, quality_tab = st.tabs([
-        "Overview",
-        "Persistence",
-        "Instructor Summary",
-        "Data Quality",
-    ])
-
-    with overview_tab:
-        _render_overview(filtered_df, exam_order, allowed_concepts, include_unmapped, personal_mode=personal_mode)
-    with persistence_tab:
-        _render_persistence(filtered_df, exam_order, personal_mode=personal_mode)
-    with instructor_tab:
-        _render_instructor_summary(filtered_df, exam_order, personal_mode)
-    with quality_tab:
-        _render_quality(filtered_df)
+    if filtered_df.empty:
+        st.info("No data available for the selected students.")
+        return
+    exam_order = _exam_order(filtered_df, student_scope_desc)
+    # st.tabs runs every tab body on each rerun even though one is shown; a view switch renders only
+    # the selected panel.
+    view = st.radio(
+        "View",
+        options=["Overview", "Persistence", "Instructor Summary", "Data Quality"],
+        horizontal=True,
+        key="explore_view",
+        label_visibility="collapsed",
+    )
+    scope_key = _scope_key(mapping_cfg, student_scope_desc)
+    if view == "Data Quality":
+        # The student filter hands back normalized_df itself when every student is in scope.
+        _render_quality(filtered_df, scope_key, validation_results if filtered_df is normalized_df else None)
+        return
+
+    bundle = _analytics_bundle(filtered_df, scope_key, exam_order)
+    if view == "Overview":
+        _render_overview(filtered_df, bundle, scope_key, exam_order, allowed_concepts, include_unmapped, personal_mode=personal_mode)
+    elif view == "Persistence":
+        _render_persistence(filtered_df, bundle, exam_order, personal_mode=personal_mode)
+    else:
+        _render_instructor_summary(bundle, personal_mode)
 
 
 if __name__ == "__main__":
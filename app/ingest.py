@@ -15,13 +15,11 @@ def load_csv(file_obj: BytesIO) -> pd.DataFrame:
 def validate_normalized(df: pd.DataFrame) -> List[str]:
     """Return a list of validation errors for a normalized dataframe."""
 
-    errors = []
-    for field in REQUIRED_FIELDS:
-        if field not in df.columns:
-            errors.append(f"Missing required column: {field}")
+    present = set(df.columns)
+    errors = [f"Missing required column: {field}" for field in REQUIRED_FIELDS if field not in present]
     if df.empty:
         errors.append("Dataset is empty")
-    if "score" in df.columns and df["score"].notna().sum() == 0:
+    if "score" in present and not df["score"].notna().any():
         errors.append("No numeric scores detected after mapping")
     return errors
 
@@ -29,7 +27,8 @@ def validate_normalized(df: pd.DataFrame) -> List[str]:
 def sanitize_rows(df: pd.DataFrame) -> pd.DataFrame:
     """Remove rows lacking basic identifiers."""
 
-    filtered = df.copy()
-    filtered = filtered[filtered["student_id"].astype(str).str.strip() != ""]
-    filtered = filtered[filtered["rubric_item"].astype(str).str.strip() != ""]
-    return filtered
+    # One combined mask; boolean indexing already returns a new frame, so no upfront copy.
+    keep = pd.Series(True, index=df.index)
+    for column in ("student_id", "rubric_item"):
+        keep &= df[column].astype("string").str.strip().fillna("").ne("")
+    return df[keep]
@@ -1,3 +1,12 @@
-from . import io, invariants, mapping, metrics, plots
+import importlib
+
+from . import io, invariants, mapping, metrics
 
 __all__ = ["io", "invariants", "mapping", "metrics", "plots"]
+
+
+def __getattr__(name):
+    # plots pulls in plotly.express (~0.5 s); import it on first access only.
+    if name == "plots":
+        return importlib.import_module(f"{__name__}.plots")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
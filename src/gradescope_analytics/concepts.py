@@ -4,8 +4,14 @@ import json
 from pathlib import Path
 from typing import Dict, Iterable, Tuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 # Values that indicate a placeholder instead of a meaningful concept name.
 _PLACEHOLDER_VALUES = {"", "none", "null", "nil", "n/a", "na", "yes", "true", "false"}
 
@@ -37,11 +43,24 @@ def normalize_mapping(mapping: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str
     return cleaned, invalid
 
 
+def _json_loads(data: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(mapping: Dict[str, str]) -> bytes:
+    # Same layout as json.dumps(indent=2, ensure_ascii=False), so files stay diffable either way.
+    if orjson is not None:
+        return orjson.dumps(mapping, option=orjson.OPT_INDENT_2)
+    return json.dumps(mapping, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 def load_concept_mapping(path: Path) -> Dict[str, str]:
     if not path.exists():
         return {}
 
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw = _json_loads(path.read_bytes())
     if not isinstance(raw, dict):
         raise ValueError("Concept mapping JSON must be an object of rubric_item -> concept")
 
@@ -56,27 +75,55 @@ def save_concept_mapping(mapping: Dict[str, str], path: Path) -> Dict[str, str]:
         raise ValueError(f"Invalid concept values for: {invalid_keys}")
 
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(cleaned, indent=2, ensure_ascii=False), encoding="utf-8")
+    path.write_bytes(_json_dumps(cleaned))
     return cleaned
 
 
+def _clean_text(values: pd.Series) -> np.ndarray:
+    """Stripped strings, blank where missing; each distinct value is cleaned once, not every row."""
+    codes, uniques = pd.factorize(values)
+    # Code -1 (missing) indexes the trailing blank.
+    cleaned = np.append(pd.Index(uniques).astype(str).str.strip().to_numpy(dtype=object), "")
+    return cleaned[codes]
+
+
+def _strip_items(values: pd.Series) -> pd.Series:
+    """Stripped rubric item labels; categoricals strip each category once and keep their codes."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        labels = values.cat.categories.astype(str).str.strip()
+        if labels.is_unique and not values.hasnans:
+            return values.cat.rename_categories(labels)
+        # Labels that collide once stripped merge into one category; the column stays categorical.
+        return pd.Series(_clean_text(values), index=values.index, name=values.name).astype("category")
+    return pd.Series(_clean_text(values), index=values.index, name=values.name)
+
+
+def _concept_label(value: object) -> str:
+    return "" if value is None or pd.isna(value) else _clean_str(value)
+
+
 def apply_concept_column(df: pd.DataFrame, mapping: Dict[str, str], unmapped_label: str = "Unmapped") -> pd.DataFrame:
-    data = df.copy()
-    data.loc[:, "rubric_item"] = data["rubric_item"].fillna("").astype(str).str.strip()
-    topic_series = data.get("topic", "").fillna("").astype(str).str.strip()
-
-    concept_series = topic_series
-    missing_topic = topic_series == ""
-    if mapping:
-        mapped = data.loc[missing_topic, "rubric_item"].map(mapping).fillna("")
-        concept_series = concept_series.where(~missing_topic, mapped)
-
-    concept_series = concept_series.fillna("").astype(str).str.strip()
-    concept_series = concept_series.where(concept_series != "", unmapped_label)
-
-    result = data.copy()
-    result.loc[:, "concept"] = concept_series
-    return result
+    # Only rubric_item and concept are replaced, so a shallow copy is enough to leave df untouched.
+    data = df.copy(deep=False)
+    data["rubric_item"] = _strip_items(data["rubric_item"])
+    if "topic" in data.columns:
+        topic = _clean_text(data["topic"])
+    else:
+        topic = np.full(len(data), "", dtype=object)
+
+    # Look the mapping up once per distinct rubric item and index the result by code, rather than
+    # mapping every row; code -1 (a missing item) indexes the trailing blank.
+    items = data["rubric_item"]
+    if isinstance(items.dtype, pd.CategoricalDtype):
+        codes, labels = items.cat.codes.to_numpy(), items.cat.categories
+    else:
+        codes, labels = pd.factorize(items)
+    lookup = np.array([_concept_label(mapping.get(label)) for label in labels] + [""], dtype=object)
+    mapped = lookup[codes] if mapping else np.full(len(data), "", dtype=object)
+
+    concept = np.where(topic != "", topic, mapped)
+    data["concept"] = np.where(concept != "", concept, unmapped_label)
+    return data
 
 
 def unmapped_count(df: pd.DataFrame, unmapped_label: str = "Unmapped") -> int:
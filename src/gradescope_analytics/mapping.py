@@ -123,8 +123,21 @@ def apply_mapping(df: pd.DataFrame, mapping: MappingConfig) -> pd.DataFrame:
     return ensure_canonical_columns(normalized)
 
 
+def _strip_text(values: pd.Series) -> pd.Series:
+    """Return ``values`` as stripped strings; clean categorical columns are returned unchanged."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        # Checking the categories covers every row, so already-normalized codes skip the string pass.
+        if categories.dtype == object and not values.isna().any() and categories.str.strip().equals(categories):
+            return values
+        values = values.astype(object)
+    return values.astype(str).str.strip()
+
+
 def ensure_canonical_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df_copy = df.copy()
+    # Shallow copy: every column written below is replaced whole, and the final column selection
+    # returns a new frame, so df is never modified.
+    df_copy = df.copy(deep=False)
     if "topic" not in df_copy.columns:
         df_copy["topic"] = ""
 
@@ -133,20 +146,20 @@ def ensure_canonical_columns(df: pd.DataFrame) -> pd.DataFrame:
         raise ValueError(f"Dataframe missing required columns: {missing_required}")
 
     for col in ["student_id", "exam_id", "question_id", "rubric_item"]:
-        df_copy.loc[:, col] = df_copy[col].astype(str).str.strip()
+        df_copy[col] = _strip_text(df_copy[col])
         if (df_copy[col] == "").any():
             raise ValueError(f"Missing required values in '{col}'")
 
     for optional_col in ["topic", "section_id", "ta_id"]:
         if optional_col not in df_copy.columns:
             df_copy[optional_col] = ""
-        df_copy.loc[:, optional_col] = df_copy[optional_col].fillna("").astype(str).str.strip()
+        df_copy[optional_col] = df_copy[optional_col].fillna("").astype(str).str.strip()
 
     points = pd.to_numeric(df_copy["points_lost"], errors="coerce")
     if points.isna().any():
         raise ValueError("points_lost column contains non-numeric values")
     if (points < 0).any():
         raise ValueError("points_lost must be non-negative")
-    df_copy.loc[:, "points_lost"] = points
+    df_copy["points_lost"] = points
 
-    return df_copy[CANONICAL_COLUMNS].copy()
+    return df_copy[CANONICAL_COLUMNS]
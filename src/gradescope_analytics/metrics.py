@@ -7,11 +7,28 @@ from .mapping import CANONICAL_COLUMNS, ensure_canonical_columns
 
 
 def _cast_numeric(df: pd.DataFrame) -> pd.DataFrame:
-    numeric = df.copy()
-    numeric.loc[:, "points_lost"] = pd.to_numeric(numeric["points_lost"], errors="coerce")
+    # Shallow copy: only points_lost is replaced, the rest share memory with df.
+    numeric = df.copy(deep=False)
+    # Numeric columns (float32 from the app's dtype pass) are already NaN-aware; skip re-parsing them.
+    if not pd.api.types.is_numeric_dtype(numeric["points_lost"]):
+        numeric["points_lost"] = pd.to_numeric(numeric["points_lost"], errors="coerce")
     return numeric
 
 
+def identifier_codes(values: pd.Series) -> pd.Series:
+    """Return integer codes for an identifier column, NaN where the value is missing.
+
+    Counting distinct codes with ``nunique`` hashes integers instead of strings;
+    categorical columns reuse their existing codes.
+    """
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+    else:
+        codes = pd.factorize(values)[0]
+    return pd.Series(codes, index=values.index).where(codes >= 0)
+
+
 def overall_summary(df: pd.DataFrame) -> Dict[str, float]:
     data = _cast_numeric(ensure_canonical_columns(df))
     avg_loss = data["points_lost"].mean()
@@ -26,26 +43,29 @@ def overall_summary(df: pd.DataFrame) -> Dict[str, float]:
 
 def rubric_item_stats(df: pd.DataFrame) -> pd.DataFrame:
     data = _cast_numeric(ensure_canonical_columns(df))
-    grouped = data.groupby(["rubric_item", "topic"], dropna=False)
-    rows = []
-    for (item, topic), subset in grouped:
-        rows.append(
-            {
-                "rubric_item": item,
-                "topic": topic if pd.notna(topic) else "",
-                "count": len(subset),
-                "avg_points_lost": subset["points_lost"].mean(),
-                "median_points_lost": subset["points_lost"].median(),
-                "std_points_lost": subset["points_lost"].std(ddof=0),
-                "total_points_lost": subset["points_lost"].sum(),
-            }
-        )
-    return pd.DataFrame(rows).sort_values(by=["topic", "rubric_item"])
+    grouped = data.groupby(["rubric_item", "topic"], dropna=False, observed=True)
+    points = grouped["points_lost"]
+    sizes = grouped.size()
+    keys = sizes.index
+    # Assemble columns directly instead of one dict per group.
+    result = pd.DataFrame(
+        {
+            "rubric_item": keys.get_level_values("rubric_item").astype(object),
+            "topic": keys.get_level_values("topic").astype(object).fillna(""),
+            "count": sizes.to_numpy(),
+            "avg_points_lost": points.mean().to_numpy(),
+            "median_points_lost": points.median().to_numpy(),
+            "std_points_lost": points.std(ddof=0).to_numpy(),
+            "total_points_lost": points.sum().to_numpy(),
+        },
+        copy=False,
+    )
+    return result.sort_values(by=["topic", "rubric_item"])
 
 
 def exam_breakdown(df: pd.DataFrame) -> pd.DataFrame:
     data = _cast_numeric(ensure_canonical_columns(df))
-    grouped = data.groupby("exam_id", dropna=False)
+    grouped = data.groupby("exam_id", dropna=False, observed=True)
     rows = []
     for exam_id, subset in grouped:
         rows.append(
@@ -83,7 +103,7 @@ def exam_changes(df: pd.DataFrame, exam_order: Optional[Iterable[str]] = None) -
 
 def student_summary(df: pd.DataFrame, exam_order: Optional[Iterable[str]] = None) -> pd.DataFrame:
     data = _cast_numeric(ensure_canonical_columns(df))
-    grouped = data.groupby(["student_id", "exam_id"], dropna=False)
+    grouped = data.groupby(["student_id", "exam_id"], dropna=False, observed=True)
     rows = []
     for (student_id, exam_id), subset in grouped:
         total_loss = subset["points_lost"].sum()
@@ -127,21 +147,25 @@ def summarize_errors(df: pd.DataFrame) -> pd.DataFrame:
     """
 
     data = _cast_numeric(ensure_canonical_columns(df))
-    grouped = data.groupby("rubric_item", dropna=False)
-    rows = []
-    for rubric_item, subset in grouped:
-        rows.append(
-            {
-                "rubric_item": rubric_item,
-                "count_rows": len(subset),
-                "students_affected": subset["student_id"].nunique(),
-                "points_lost_total": subset["points_lost"].sum(),
-                "points_lost_mean": subset["points_lost"].mean(),
-            }
+    scoped = pd.DataFrame(
+        {
+            "rubric_item": data["rubric_item"],
+            "student_code": identifier_codes(data["student_id"]),
+            "points_lost": data["points_lost"],
+        }
+    )
+    result = (
+        scoped.groupby("rubric_item", dropna=False, observed=True)
+        .agg(
+            count_rows=("points_lost", "size"),
+            students_affected=("student_code", "nunique"),
+            points_lost_total=("points_lost", "sum"),
+            points_lost_mean=("points_lost", "mean"),
         )
-
-    result = pd.DataFrame(rows)
+        .reset_index()
+    )
     if not result.empty:
+        result["rubric_item"] = result["rubric_item"].astype(object)
         result = result.sort_values(by="rubric_item")
     return result
 
@@ -150,7 +174,7 @@ def error_by_exam(df: pd.DataFrame) -> pd.DataFrame:
     """Return rubric error totals per exam in long form."""
 
     data = _cast_numeric(ensure_canonical_columns(df))
-    grouped = data.groupby(["exam_id", "rubric_item"], dropna=False)
+    grouped = data.groupby(["exam_id", "rubric_item"], dropna=False, observed=True)
     rows = []
     for (exam_id, rubric_item), subset in grouped:
         rows.append(
@@ -179,13 +203,13 @@ def group_comparison(df: pd.DataFrame, group_col: str, missing_label: str = "Una
     if group_col not in data.columns:
         return pd.DataFrame()
 
-    data = data.copy()
-    data.loc[:, group_col] = data[group_col].fillna("").astype(str).str.strip()
-    if data[group_col].eq("").all():
+    # data is already a fresh frame from ensure_canonical_columns; replace the column, no copy.
+    labels = data[group_col].fillna("").astype(str).str.strip()
+    if labels.eq("").all():
         return pd.DataFrame()
-    data.loc[:, group_col] = data[group_col].replace({"": missing_label})
+    data[group_col] = labels.replace({"": missing_label})
 
-    grouped = data.groupby(group_col, dropna=False)
+    grouped = data.groupby(group_col, dropna=False, observed=True)
     rows = []
     for group_value, subset in grouped:
         students = subset["student_id"].nunique()
@@ -234,14 +258,15 @@ def compute_persistence(df: pd.DataFrame, exam_order: Optional[Iterable[str]] =
     first_exam = order_list[0]
     later_exams = set(order_list[1:])
     exam_rank = {exam: idx for idx, exam in enumerate(order_list)}
+    later_exam_ids = [exam for exam, rank in exam_rank.items() if rank > 0]
 
     rows = []
-    for rubric_item, subset in data.groupby("rubric_item", dropna=False):
+    for rubric_item, subset in data.groupby("rubric_item", dropna=False, observed=True):
         cohort_students = subset.loc[subset["exam_id"] == first_exam, "student_id"].unique()
         cohort_set = set(cohort_students)
 
         if later_exams:
-            later_subset = subset[subset["exam_id"].map(lambda x: exam_rank.get(x, -1) > 0)]
+            later_subset = subset[subset["exam_id"].isin(later_exam_ids)]
         else:
             later_subset = subset.iloc[0:0]
 
@@ -1,29 +1,32 @@
 import pandas as pd
 from typing import Iterable, List, Optional, Set
 
+from .metrics import identifier_codes
+
 
 def _concept_stats(df: pd.DataFrame) -> pd.DataFrame:
-    data = df.copy()
-    data.loc[:, "concept"] = data.get("concept", "").fillna("").astype(str).str.strip()
-    data.loc[:, "points_lost"] = pd.to_numeric(data["points_lost"], errors="coerce")
-    scoped = data[data["concept"] != ""]
+    concept = df.get("concept", pd.Series("", index=df.index)).fillna("").astype(str).str.strip()
+    # Only the three columns aggregated below are materialized, not a copy of the whole frame.
+    scoped = pd.DataFrame(
+        {
+            "concept": concept,
+            "student_code": identifier_codes(df["student_id"]),
+            "points_lost": pd.to_numeric(df["points_lost"], errors="coerce"),
+        }
+    )[concept != ""]
     if scoped.empty:
         return pd.DataFrame(columns=["concept", "rows", "students_affected", "points_lost_total", "points_lost_mean"])
 
-    grouped = scoped.groupby("concept", dropna=False)
-    rows = []
-    for concept, subset in grouped:
-        rows.append(
-            {
-                "concept": concept,
-                "rows": len(subset),
-                "students_affected": subset["student_id"].nunique(),
-                "points_lost_total": subset["points_lost"].sum(),
-                "points_lost_mean": subset["points_lost"].mean(),
-            }
+    result = (
+        scoped.groupby("concept", observed=True)
+        .agg(
+            rows=("points_lost", "size"),
+            students_affected=("student_code", "nunique"),
+            points_lost_total=("points_lost", "sum"),
+            points_lost_mean=("points_lost", "mean"),
         )
-
-    result = pd.DataFrame(rows)
+        .reset_index()
+    )
     return result.sort_values(by="points_lost_total", ascending=False)
 
 
@@ -31,9 +34,9 @@ def _concept_persistence(df: pd.DataFrame, exam_order: List[str]) -> pd.DataFram
     if len(exam_order) < 2:
         return pd.DataFrame(columns=["concept", "cohort_size", "repeated", "persistence_rate"])
 
-    data = df.copy()
-    data.loc[:, "concept"] = data.get("concept", "").fillna("").astype(str).str.strip()
-    data = data[data["concept"] != ""]
+    concept = df.get("concept", pd.Series("", index=df.index)).fillna("").astype(str).str.strip()
+    # Only the three columns used below are materialized, not a copy of the whole frame.
+    data = pd.DataFrame({"concept": concept, "exam_id": df["exam_id"], "student_id": df["student_id"]})[concept != ""]
     if data.empty:
         return pd.DataFrame(columns=["concept", "cohort_size", "repeated", "persistence_rate"])
 
@@ -43,27 +46,16 @@ def _concept_persistence(df: pd.DataFrame, exam_order: List[str]) -> pd.DataFram
         return pd.DataFrame(columns=["concept", "cohort_size", "repeated", "persistence_rate"])
 
     first_exam = order_list[0]
-    rows = []
-    for concept, subset in data.groupby("concept", dropna=False):
-        cohort_students = set(subset.loc[subset["exam_id"] == first_exam, "student_id"].unique())
-        if not cohort_students:
-            continue
-        later_subset = subset[subset["exam_id"].map(lambda x: exam_rank.get(x, -1) > 0)]
-        repeated = set(later_subset["student_id"].unique()) & cohort_students
-        cohort_size = len(cohort_students)
-        rows.append(
-            {
-                "concept": concept,
-                "cohort_size": cohort_size,
-                "repeated": len(repeated),
-                "persistence_rate": len(repeated) / cohort_size if cohort_size else 0.0,
-            }
-        )
-
-    result = pd.DataFrame(rows)
-    if not result.empty:
-        result = result.sort_values(by="persistence_rate", ascending=False)
-    return result
+    later_exam_ids = [exam for exam, rank in exam_rank.items() if rank > 0]
+    # (concept, student) pairs seen on the first exam, and on any later exam, deduplicated once
+    # instead of building per-concept sets.
+    cohort = data.loc[data["exam_id"] == first_exam, ["concept", "student_id"]].drop_duplicates()
+    later = data.loc[data["exam_id"].isin(later_exam_ids), ["concept", "student_id"]].drop_duplicates()
+    cohort = cohort.assign(repeated=pd.MultiIndex.from_frame(cohort).isin(pd.MultiIndex.from_frame(later)))
+
+    result = cohort.groupby("concept").agg(cohort_size=("student_id", "size"), repeated=("repeated", "sum")).reset_index()
+    result["persistence_rate"] = result["repeated"] / result["cohort_size"]
+    return result.sort_values(by="persistence_rate", ascending=False)
 
 
 def _filter_allowed_concepts(df: pd.DataFrame, allowed: Optional[Iterable[str]]) -> pd.DataFrame:
@@ -13,7 +13,7 @@ from gradescope_analytics.metrics import (
     summarize_errors,
     student_summary,
 )
-from gradescope_analytics.recommendations import compute_recommendations
+from gradescope_analytics.recommendations import _concept_persistence, compute_recommendations
 
 
 def test_overall_summary(sample_df):
@@ -84,6 +84,20 @@ def test_error_by_exam_long_format():
     assert exam2_a["points_lost_total"] == 3
 
 
+def test_metrics_match_for_categorical_identifiers(sample_df):
+    categorical = sample_df.copy()
+    for col in ("student_id", "exam_id", "question_id", "rubric_item"):
+        categorical[col] = categorical[col].astype("category")
+    # Dropping one exam leaves unobserved categories that must not show up as empty groups.
+    first_exam = sorted(sample_df["exam_id"].unique())[0]
+    subset = categorical[categorical["exam_id"] != first_exam]
+    expected = sample_df[sample_df["exam_id"] != first_exam]
+
+    for func in (summarize_errors, error_by_exam, rubric_item_stats):
+        result = func(subset).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, func(expected).reset_index(drop=True), check_categorical=False, check_dtype=False)
+
+
 def test_group_comparison_section_and_ta():
     df = pd.DataFrame(
         [
@@ -173,3 +187,37 @@ def test_exam_changes_delta_order(sample_df):
     assert list(changes["exam_id"].astype(str)) == order
     assert "delta_vs_prev" in changes.columns
     assert "pct_change_vs_prev" in changes.columns
+
+
+def _concept_persistence_loop(df, exam_order):
+    """Per-concept set implementation _concept_persistence replaced, kept as the reference."""
+    data = df.copy()
+    data["concept"] = data["concept"].fillna("").astype(str).str.strip()
+    data = data[data["concept"] != ""]
+    order_list = [exam for exam in exam_order if exam in data["exam_id"].unique()]
+    first_exam = order_list[0]
+    later_exam_ids = [exam for rank, exam in enumerate(exam_order) if rank > 0]
+    rows = []
+    for concept, subset in data.groupby("concept"):
+        cohort = set(subset.loc[subset["exam_id"] == first_exam, "student_id"].unique())
+        if not cohort:
+            continue
+        repeated = set(subset.loc[subset["exam_id"].isin(later_exam_ids), "student_id"].unique()) & cohort
+        rows.append({"concept": concept, "cohort_size": len(cohort), "repeated": len(repeated), "persistence_rate": len(repeated) / len(cohort)})
+    return pd.DataFrame(rows).sort_values(by="persistence_rate", ascending=False)
+
+
+@pytest.mark.parametrize("exam_order", [["Exam1", "Exam2", "Exam3"], ["Exam0", "Exam1", "Exam2"]])
+def test_concept_persistence_matches_per_concept_loop(exam_order):
+    rows = [
+        ("s1", "Exam1", "Acids"), ("s1", "Exam1", "Acids"), ("s2", "Exam1", "Acids"), ("s3", "Exam1", "Acids"),
+        ("s1", "Exam2", "Acids"), ("s3", "Exam3", "Acids"),
+        ("s1", "Exam1", "Bases"), ("s2", "Exam1", "Bases"), ("s2", "Exam2", "Bases"),
+        ("s4", "Exam2", "Rings"), ("s4", "Exam1", " "),
+    ]
+    df = pd.DataFrame(rows, columns=["student_id", "exam_id", "concept"])
+
+    result = _concept_persistence(df, exam_order).reset_index(drop=True)
+    expected = _concept_persistence_loop(df, exam_order).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert "Rings" not in set(result["concept"])
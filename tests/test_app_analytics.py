@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analytics import (
+    _cast_numeric,
+    category_breakdown,
+    compute_all,
+    prepare,
+    rubric_item_stats,
+    score_distribution,
+    student_summary,
+)
+from app.mapping import apply_mapping, suggest_mapping
+from app.models import MappingConfig
+from app.sample_data import load_sample_dataframe
+
+
+@pytest.fixture()
+def legacy_df() -> pd.DataFrame:
+    raw = load_sample_dataframe()
+    return apply_mapping(raw, MappingConfig.from_dict(suggest_mapping(raw)))
+
+
+def test_rubric_item_stats_matches_sample(legacy_df):
+    stats = rubric_item_stats(legacy_df)
+    assert list(stats["rubric_item"]) == ["Correctness", "Style"]
+
+    correctness = stats[stats["rubric_item"] == "Correctness"].iloc[0]
+    assert correctness["count"] == 3
+    assert pytest.approx(correctness["avg_score"], rel=1e-9) == 8.0
+    assert pytest.approx(correctness["std_score"], rel=1e-6) == 1.632993
+    assert correctness["max_score_value"] == 10
+    assert pytest.approx(correctness["full_points_pct"], rel=1e-9) == 100 / 3
+
+
+def test_rubric_item_stats_handles_missing_values():
+    df = pd.DataFrame(
+        [
+            {"student_id": "s1", "rubric_item": "A", "category": None, "score": 2, "max_score": 2},
+            {"student_id": "s2", "rubric_item": "A", "category": None, "score": 1, "max_score": None},
+            {"student_id": "s1", "rubric_item": "B", "category": "Core", "score": 1, "max_score": None},
+        ]
+    )
+
+    stats = rubric_item_stats(df)
+    row_a = stats[stats["rubric_item"] == "A"].iloc[0]
+    assert row_a["category"] == "Uncategorized"
+    assert row_a["count"] == 2
+    assert row_a["full_points_pct"] == 100.0
+
+    row_b = stats[stats["rubric_item"] == "B"].iloc[0]
+    assert pd.isna(row_b["full_points_pct"])
+    assert pd.isna(row_b["max_score_value"])
+
+
+def test_rubric_item_stats_skips_unobserved_categorical_groups(legacy_df):
+    data = legacy_df.copy()
+    data["rubric_item"] = pd.Categorical(data["rubric_item"], categories=["Correctness", "Style", "Unused"])
+    data["category"] = pd.Categorical(data["category"], categories=["Technical", "Empty"])
+
+    stats = rubric_item_stats(data)
+    assert len(stats) == 2
+    assert "Unused" not in set(stats["rubric_item"])
+    assert stats["rubric_item"].dtype == object
+
+
+def test_cast_numeric_leaves_input_untouched():
+    df = pd.DataFrame({"student_id": ["s1", "s2"], "score": ["1", "x"], "max_score": ["2", "2"]})
+
+    numeric = _cast_numeric(df)
+    assert numeric["score"].tolist()[0] == 1
+    assert pd.isna(numeric["score"].iloc[1])
+    assert df["score"].tolist() == ["1", "x"]
+    assert df["max_score"].tolist() == ["2", "2"]
+
+
+def test_cast_numeric_reuses_float_columns():
+    df = pd.DataFrame({"score": [1.0, 2.5], "max_score": [2.0, 3.0]})
+
+    numeric = _cast_numeric(df)
+    assert np.shares_memory(numeric["score"].to_numpy(), df["score"].to_numpy())
+    assert numeric["max_score"].dtype == np.float64
+
+
+def test_cast_numeric_makes_strided_float_columns_contiguous():
+    df = pd.DataFrame(np.array([[1.0, 2.0], [2.0, 2.0], [0.5, 1.0]]), columns=["score", "max_score"])
+    assert not df["score"].to_numpy().flags["C_CONTIGUOUS"]
+
+    numeric = _cast_numeric(df)
+    assert numeric["score"].to_numpy().flags["C_CONTIGUOUS"]
+    assert numeric["max_score"].to_numpy().flags["C_CONTIGUOUS"]
+    assert numeric["score"].tolist() == [1.0, 2.0, 0.5]
+
+
+def test_compute_all_matches_individual_tables(legacy_df):
+    bundle = compute_all(legacy_df, bins=5)
+
+    pd.testing.assert_frame_equal(bundle.rubric_items, rubric_item_stats(legacy_df))
+    pd.testing.assert_frame_equal(bundle.categories, category_breakdown(legacy_df))
+    pd.testing.assert_frame_equal(bundle.students, student_summary(legacy_df))
+    pd.testing.assert_frame_equal(bundle.distribution, score_distribution(legacy_df, bins=5))
+
+
+def test_category_breakdown_totals_and_missing_category():
+    df = pd.DataFrame(
+        [
+            {"student_id": "s1", "rubric_item": "A", "category": "Core", "score": 3, "max_score": 4},
+            {"student_id": "s2", "rubric_item": "B", "category": "Core", "score": 1, "max_score": 4},
+            {"student_id": "s1", "rubric_item": "C", "category": None, "score": 0, "max_score": 0},
+        ]
+    )
+
+    breakdown = category_breakdown(df)
+    core = breakdown[breakdown["category"] == "Core"].iloc[0]
+    assert core["items"] == 2
+    assert core["submissions"] == 2
+    assert pytest.approx(core["pct_of_total"], rel=1e-9) == 50.0
+
+    uncategorized = breakdown[breakdown["category"] == "Uncategorized"].iloc[0]
+    assert pd.isna(uncategorized["pct_of_total"])
+
+
+def test_category_breakdown_counts_skip_missing_identifiers():
+    df = pd.DataFrame(
+        [
+            {"student_id": "s1", "rubric_item": "A", "category": "Core", "score": 1, "max_score": 1},
+            {"student_id": None, "rubric_item": "A", "category": "Core", "score": 1, "max_score": 1},
+            {"student_id": "s2", "rubric_item": None, "category": "Core", "score": 0, "max_score": 1},
+        ]
+    )
+
+    core = category_breakdown(df).iloc[0]
+    assert core["items"] == 1
+    assert core["submissions"] == 2
+
+
+def test_prepared_frame_is_reused_by_table_functions(legacy_df):
+    prepared = prepare(legacy_df)
+    assert prepared["_full"].tolist() == [0, 0, 1, 1, 0, 0]
+    assert "_full" not in legacy_df.columns
+    assert isinstance(prepared["rubric_item"].dtype, pd.CategoricalDtype)
+    assert legacy_df["rubric_item"].dtype == object
+
+    pd.testing.assert_frame_equal(rubric_item_stats(prepared), rubric_item_stats(legacy_df))
+    pd.testing.assert_frame_equal(score_distribution(prepared, bins=4), score_distribution(legacy_df, bins=4))
+
+
+def test_student_summary_reports_plain_labels(legacy_df):
+    summary = student_summary(prepare(legacy_df))
+    for column in ("student_id", "student_name", "assignment"):
+        assert summary[column].dtype == object
+    assert summary["percent"].is_monotonic_decreasing
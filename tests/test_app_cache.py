@@ -0,0 +1,28 @@
+import os
+
+import app.app as app_module
+
+
+def test_uploads_have_no_disk_cache_path():
+    assert app_module._source_digest(demo_mode=False, synthetic_mode=False) is None
+    assert app_module._normalized_cache_path(None, {"student_id": "id"}) is None
+
+
+def test_cache_key_includes_format_version(monkeypatch):
+    current = app_module._normalized_cache_path("digest", None)
+    monkeypatch.setattr(app_module, "NORMALIZED_CACHE_VERSION", app_module.NORMALIZED_CACHE_VERSION + 1)
+    assert app_module._normalized_cache_path("digest", None) != current
+
+
+def test_prune_drops_stale_and_excess_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "NORMALIZED_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(app_module, "NORMALIZED_CACHE_MAX_FILES", 2)
+    now = 1_000_000_000.0
+    ages = {"fresh.parquet": 10, "recent.parquet": 20, "older.parquet": 30, "stale.parquet": app_module.NORMALIZED_CACHE_MAX_AGE_SECONDS + 1}
+    for name, age in ages.items():
+        path = tmp_path / name
+        path.write_bytes(b"")
+        os.utime(path, (now - age, now - age))
+
+    app_module._prune_normalized_cache(now)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["fresh.parquet", "recent.parquet"]
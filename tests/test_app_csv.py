@@ -0,0 +1,46 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from app.app import _parse_csv
+
+
+def _parse(text: str) -> pd.DataFrame:
+    return _parse_csv(BytesIO(text.encode("utf-8")))
+
+
+def test_parse_csv_renames_duplicate_headers_like_the_c_parser():
+    text = "student_id,points_lost,student_id\ns1,1,x\ns2,2,y\n"
+
+    frame = _parse(text)
+    assert list(frame.columns) == ["student_id", "points_lost", "student_id.1"]
+    pd.testing.assert_frame_equal(frame, pd.read_csv(BytesIO(text.encode("utf-8"))))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "student_id,points_lost,\ns1,1,\ns2,2,\n",
+        "student_id,,points_lost\ns1,x,1\ns2,y,2\n",
+    ],
+)
+def test_parse_csv_names_blank_headers_like_the_c_parser(text):
+    frame = _parse(text)
+    assert not any(column == "" for column in frame.columns)
+    pd.testing.assert_frame_equal(frame, pd.read_csv(BytesIO(text.encode("utf-8"))))
+
+
+@pytest.mark.parametrize(
+    "ids",
+    [
+        ["123456789012345678901", "123456789012345678902"],
+        ["18446744073709551615", "18446744073709551614"],
+    ],
+)
+def test_parse_csv_keeps_large_integer_ids_distinct(ids):
+    text = "student_id,points_lost\n" + "".join(f"{sid},1\n" for sid in ids)
+
+    frame = _parse(text)
+    assert frame["student_id"].astype(str).tolist() == ids
+    pd.testing.assert_frame_equal(frame, pd.read_csv(BytesIO(text.encode("utf-8"))))
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from app.app import _maybe_anonymize_students, _misconception_clusters
+
+
+@pytest.fixture()
+def cooccurrence_df() -> pd.DataFrame:
+    incidence = {
+        "Arrow": ["s1", "s2", "s3"],
+        "Charge": ["s1", "s2", "s3"],
+        "Stereo": ["s4", "s5"],
+        "Chirality": ["s4", "s5", "s6"],
+        "Units": ["s7", "s8"],
+        "Typo": ["s6"],
+    }
+    rows = [(student, item) for item, students in incidence.items() for student in students]
+    # A repeated row must count once.
+    rows.append(("s1", "Arrow"))
+    return pd.DataFrame(rows, columns=["student_id", "rubric_item"]).astype("category")
+
+
+def test_misconception_clusters_membership(cooccurrence_df):
+    clusters, similarities = _misconception_clusters(cooccurrence_df)
+
+    assert [(c["label"], c["members"], c["support_students"]) for c in clusters] == [
+        ("Misconception 1", ["Arrow", "Charge"], 3),
+        ("Misconception 2", ["Chirality", "Stereo"], 3),
+        ("Misconception 3", ["Units"], 2),
+    ]
+    # Typo has a single student, below min_support, so it is in no cluster and no pair.
+    assert list(zip(similarities["rubric_item_a"], similarities["rubric_item_b"])) == [("Arrow", "Charge"), ("Stereo", "Chirality")]
+    assert similarities["jaccard"].tolist() == pytest.approx([1.0, 2 / 3])
+    assert similarities["cooccurrence"].tolist() == [3, 2]
+
+
+def test_misconception_clusters_truncates_pairs_by_jaccard(cooccurrence_df):
+    clusters, similarities = _misconception_clusters(cooccurrence_df, max_pairs=1)
+
+    assert list(zip(similarities["rubric_item_a"], similarities["rubric_item_b"])) == [("Arrow", "Charge")]
+    # Truncation only limits the similarity table; clusters still use every linked pair.
+    assert [c["members"] for c in clusters][:2] == [["Arrow", "Charge"], ["Chirality", "Stereo"]]
+
+
+@pytest.fixture()
+def roster_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "student_id": ["s10", "s2", "s10", "s7"],
+            "student_name": ["Ada", "Ben", "Ada", "Cy"],
+            "points_lost": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_anonymize_students_gives_stable_pseudonyms(roster_df, dtype):
+    df = roster_df.astype({"student_id": dtype})
+
+    result = _maybe_anonymize_students(df, enabled=True)
+    # Aliases follow the ids' text order ("s10" < "s2" < "s7"); every row of a student gets the same one.
+    expected = ["Student 001", "Student 002", "Student 001", "Student 003"]
+    assert result["student_id"].astype(str).tolist() == expected
+    assert result["student_name"].astype(str).tolist() == expected
+    # Row order does not change who gets which alias.
+    shuffled = _maybe_anonymize_students(df.iloc[::-1], enabled=True)
+    assert shuffled["student_id"].astype(str).tolist() == expected[::-1]
+
+
+def test_anonymize_students_leaves_input_unchanged(roster_df):
+    before = roster_df.copy()
+
+    result = _maybe_anonymize_students(roster_df, enabled=True)
+    pd.testing.assert_frame_equal(roster_df, before)
+    pd.testing.assert_series_equal(result["points_lost"], before["points_lost"])
+    assert _maybe_anonymize_students(roster_df, enabled=False) is roster_df
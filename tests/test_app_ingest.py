@@ -0,0 +1,24 @@
+import pandas as pd
+
+from app.ingest import sanitize_rows, validate_normalized
+
+
+def test_sanitize_rows_drops_blank_and_missing_identifiers():
+    df = pd.DataFrame(
+        {
+            "student_id": ["s1", "  ", None, "s4", "s5"],
+            "rubric_item": ["A", "B", "C", "", "E"],
+            "score": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+
+    result = sanitize_rows(df)
+    assert result["student_id"].tolist() == ["s1", "s5"]
+    assert len(df) == 5
+
+
+def test_validate_normalized_reports_missing_columns_and_scores():
+    df = pd.DataFrame({"student_id": ["s1"], "rubric_item": ["A"], "score": [None]})
+
+    errors = validate_normalized(df)
+    assert errors == ["Missing required column: student_name", "No numeric scores detected after mapping"]
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.app import _build_predictive_frames, _predict_future_risks
+
+EXAM_ORDER = ["Exam1", "Exam2", "Exam3"]
+
+
+@pytest.fixture()
+def history_df() -> pd.DataFrame:
+    rows = [
+        ("s1", "Exam1", "Arrow", "Mechanisms", 2.0),
+        ("s1", "Exam1", "Charge", "Mechanisms", 1.0),
+        ("s1", "Exam2", "Arrow", "Mechanisms", 1.5),
+        ("s1", "Exam3", "Stereo", "Stereochemistry", 2.0),
+        ("s2", "Exam1", "Stereo", "Stereochemistry", 1.0),
+        ("s2", "Exam2", "Stereo", "Stereochemistry", 0.5),
+        ("s2", "Exam2", "Arrow", "Mechanisms", 1.0),
+        ("s3", "Exam2", "Charge", "Mechanisms", 3.0),
+        ("s3", "Exam3", "Charge", "Mechanisms", 1.0),
+        ("s3", "Exam3", "Units", "", 0.5),
+        ("s4", "Exam1", "Units", "", 1.0),
+    ]
+    # Students who repeat the same mistake push some predictions out of the low band.
+    for student in ("s5", "s6", "s7", "s8"):
+        rows += [(student, "Exam1", "Arrow", "Mechanisms", 1.0), (student, "Exam2", "Arrow", "Mechanisms", 1.0)]
+    df = pd.DataFrame(rows, columns=["student_id", "exam_id", "rubric_item", "concept", "points_lost"])
+    for column in ("student_id", "exam_id", "rubric_item"):
+        df[column] = df[column].astype("category")
+    df["points_lost"] = df["points_lost"].astype(np.float32)
+    return df
+
+
+def _loop_frames(df, exam_order):
+    """The per-student loop _build_predictive_frames replaced, kept as the reference."""
+    data = df.astype({"student_id": str, "exam_id": str, "rubric_item": str})
+    data["points_lost"] = data["points_lost"].astype(float)
+    items = sorted(data["rubric_item"].unique())
+    concept_for_item = data.groupby("rubric_item")["concept"].agg(lambda s: s.mode().iat[0]).to_dict()
+    exam_rank = {exam: idx for idx, exam in enumerate(exam_order)}
+
+    def features(student_id, prior_df):
+        seen = set(prior_df["rubric_item"])
+        for item in items:
+            concept = concept_for_item.get(item, "")
+            points = prior_df.loc[prior_df["concept"] == concept, "points_lost"].sum() if concept else 0.0
+            yield item, int(item in seen), points
+
+    training_rows, scoring_rows = [], []
+    for student_id, sub in data.groupby("student_id"):
+        exams = sorted(sub["exam_id"].unique(), key=lambda x: exam_rank.get(x, 1e9))
+        for idx in range(1, len(exams)):
+            prior_df = sub[sub["exam_id"].isin(exams[:idx])]
+            current_items = set(sub.loc[sub["exam_id"] == exams[idx], "rubric_item"])
+            for item, seen, points in features(student_id, prior_df):
+                training_rows.append((student_id, exams[idx], item, seen, points, int(item in current_items)))
+        prior_df = sub[sub["exam_id"].isin(exams[:-1])]
+        for item, seen, points in features(student_id, prior_df):
+            scoring_rows.append((student_id, item, seen, points))
+
+    train_df = pd.DataFrame(training_rows, columns=["student_id", "exam_id", "rubric_item", "prior_seen", "prior_concept_points", "label"])
+    score_df = pd.DataFrame(scoring_rows, columns=["student_id", "rubric_item", "prior_seen", "prior_concept_points"])
+    return train_df, score_df, items
+
+
+def _sorted(frame, keys):
+    return frame.sort_values(keys).reset_index(drop=True)
+
+
+def test_predictive_frames_match_per_student_loop(history_df):
+    train_df, score_df, items = _build_predictive_frames(history_df, EXAM_ORDER)
+    expected_train, expected_score, expected_items = _loop_frames(history_df, EXAM_ORDER)
+
+    assert items == expected_items
+    assert len(train_df) == len(expected_train) == 8 * len(items)
+    assert len(score_df) == len(expected_score) == 8 * len(items)
+    train_keys = ["student_id", "exam_id", "rubric_item"]
+    pd.testing.assert_frame_equal(
+        _sorted(train_df[expected_train.columns], train_keys), _sorted(expected_train, train_keys), check_dtype=False
+    )
+    score_keys = ["student_id", "rubric_item"]
+    pd.testing.assert_frame_equal(
+        _sorted(score_df[expected_score.columns], score_keys), _sorted(expected_score, score_keys), check_dtype=False
+    )
+
+
+def test_predicted_risk_labels_match_unweighted_fit(history_df):
+    from sklearn.linear_model import LogisticRegression
+
+    score_df, coef_df, error = _predict_future_risks(history_df, EXAM_ORDER)
+    assert error is None
+
+    # Reference: the original fit on every training row, one row per (visit, item).
+    expected_train, expected_score, _ = _loop_frames(history_df, EXAM_ORDER)
+    features = ["prior_seen", "prior_concept_points"]
+    model = LogisticRegression(max_iter=200).fit(expected_train[features], expected_train["label"])
+    expected_score["probability"] = model.predict_proba(expected_score[features])[:, 1]
+    expected_score["confidence"] = expected_score["probability"].apply(
+        lambda p: "high" if p >= 0.7 else ("medium" if p >= 0.4 else "low")
+    )
+
+    keys = ["student_id", "rubric_item"]
+    result = _sorted(score_df, keys)
+    expected = _sorted(expected_score, keys)
+    np.testing.assert_allclose(result["probability"], expected["probability"], atol=1e-3)
+    assert result["confidence"].tolist() == expected["confidence"].tolist()
+    assert {"low", "medium"} <= set(result["confidence"])
+    np.testing.assert_allclose(coef_df["coefficient"], model.coef_[0], atol=1e-3)
@@ -27,6 +27,15 @@ def test_load_concept_mapping_drops_placeholders(tmp_path: Path):
     assert result == {"Item A": "Valid"}
 
 
+def test_concept_mapping_round_trips_non_ascii(tmp_path: Path):
+    path = tmp_path / "concept_mappings.json"
+    mapping = {"Item A": "Récursion", "Item B": "Loops"}
+
+    assert save_concept_mapping(mapping, path) == mapping
+    assert "Récursion" in path.read_text(encoding="utf-8")
+    assert load_concept_mapping(path) == mapping
+
+
 def test_apply_concept_column_prioritizes_topic_and_mapping():
     df = pd.DataFrame(
         [
@@ -42,6 +51,17 @@ def test_apply_concept_column_prioritizes_topic_and_mapping():
     assert list(result["concept"]) == ["Topic A", "Concept B", "Unmapped"]
 
 
+def test_apply_concept_column_leaves_input_untouched():
+    df = pd.DataFrame([{"student_id": "s1", "rubric_item": " Item A ", "topic": "", "points_lost": 1}])
+
+    result = apply_concept_column(df, {"Item A": "Concept A"})
+
+    assert result.loc[0, "rubric_item"] == "Item A"
+    assert result.loc[0, "concept"] == "Concept A"
+    assert df.loc[0, "rubric_item"] == " Item A "
+    assert "concept" not in df.columns
+
+
 def test_compute_recommendations_excludes_unmapped_by_default():
     df = pd.DataFrame(
         [
@@ -63,3 +83,35 @@ def test_compute_recommendations_excludes_unmapped_by_default():
         allowed_concepts=["Mapped", "Unmapped"],
     )
     assert set(recs_with_unmapped["concept"]) == {"Mapped", "Unmapped"}
+
+
+def test_apply_concept_column_keeps_categorical_rubric_items():
+    df = pd.DataFrame(
+        {
+            "rubric_item": pd.Categorical([" Item A", "Item B", " Item A"]),
+            "topic": ["", "", "Topic"],
+            "points_lost": [1, 2, 3],
+        }
+    )
+
+    result = apply_concept_column(df, {"Item A": "Concept A"})
+
+    assert isinstance(result["rubric_item"].dtype, pd.CategoricalDtype)
+    assert list(result["rubric_item"]) == ["Item A", "Item B", "Item A"]
+    assert list(result["concept"]) == ["Concept A", "Unmapped", "Topic"]
+
+
+def test_apply_concept_column_keeps_categorical_when_stripped_labels_collide():
+    df = pd.DataFrame(
+        {
+            "rubric_item": pd.Categorical(["Item A", " Item A", None]),
+            "topic": ["", "", ""],
+            "points_lost": [1, 2, 3],
+        }
+    )
+
+    result = apply_concept_column(df, {"Item A": "Concept A"})
+
+    assert isinstance(result["rubric_item"].dtype, pd.CategoricalDtype)
+    assert list(result["concept"][:2]) == ["Concept A", "Concept A"]
+    assert result["rubric_item"].iloc[0] == result["rubric_item"].iloc[1] == "Item A"